@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import os
 import inspect
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 from openpyxl import Workbook
@@ -10,12 +11,12 @@ from gdrive_utils import get_drive_manager
 
 # Import from modules
 from config import ROOT_DIR, DD_DATA_MASTER, UE_DATA_MASTER, DD_MKT_PRE_24, DD_MKT_POST_24, DD_MKT_PRE_25, DD_MKT_POST_25, UE_MKT_PRE_24, UE_MKT_POST_24, UE_MKT_PRE_25, UE_MKT_POST_25
-from utils import normalize_store_id_column, filter_excluded_dates, filter_master_file_by_date_range
+from utils import normalize_store_id_column, filter_excluded_dates, filter_master_file_by_date_range, drop_empty_rows, sorted_store_ids
 from data_loading import process_master_file_for_dd, process_master_file_for_ue
-from data_processing import load_and_aggregate_ue_data, load_and_aggregate_dd_data, load_and_aggregate_new_customers, process_data, process_new_customers_data
+from data_processing import load_and_aggregate_ue_data, load_and_aggregate_dd_data, load_and_aggregate_new_customers, process_data, process_new_customers_data, run_loads
 from marketing_analysis import create_corporate_vs_todc_table
 from table_generation import create_summary_tables, create_combined_summary_tables, create_combined_store_tables, get_platform_store_tables, get_platform_summary_tables
-from ui_components import create_store_selector, display_store_tables, display_summary_tables, display_platform_data
+from ui_components import create_store_selector, display_store_tables, display_summary_tables, display_platform_data, style_summary_table
 from export_functions import export_to_excel, create_date_export, create_date_export_from_master_files
 from file_upload_screen import display_file_upload_screen
 
@@ -534,29 +535,18 @@ def main():
     
     # Load both platforms' data
     with st.spinner("Loading data for both platforms..."):
-        # Load UberEats data (using master file if date ranges provided)
+        # Load UberEats and DoorDash data (master files, if date ranges provided); the two files load concurrently
+        date_ranges = dict(excluded_dates=excluded_dates, pre_start_date=pre_start, pre_end_date=pre_end,
+                           post_start_date=post_start, post_end_date=post_end)
+        ue_periods, dd_periods = run_loads(partial(load_and_aggregate_ue_data, ue_data_path=ue_data_path, **date_ranges),
+                                           partial(load_and_aggregate_dd_data, dd_data_path=dd_data_path, **date_ranges))
         (ue_pre_24_sales, ue_pre_24_payouts, ue_pre_24_orders, ue_post_24_sales, ue_post_24_payouts, ue_post_24_orders,
-         ue_pre_25_sales, ue_pre_25_payouts, ue_pre_25_orders, ue_post_25_sales, ue_post_25_payouts, ue_post_25_orders) = load_and_aggregate_ue_data(
-            excluded_dates=excluded_dates,
-            pre_start_date=pre_start,
-            pre_end_date=pre_end,
-            post_start_date=post_start,
-            post_end_date=post_end,
-            ue_data_path=ue_data_path
-        )
+         ue_pre_25_sales, ue_pre_25_payouts, ue_pre_25_orders, ue_post_25_sales, ue_post_25_payouts, ue_post_25_orders) = ue_periods
         ue_sales_df, ue_payouts_df, ue_orders_df = process_data(ue_pre_24_sales, ue_pre_24_payouts, ue_pre_24_orders, ue_post_24_sales, ue_post_24_payouts, ue_post_24_orders,
                                                                   ue_pre_25_sales, ue_pre_25_payouts, ue_pre_25_orders, ue_post_25_sales, ue_post_25_payouts, ue_post_25_orders)
         
-        # Load DoorDash data (using financial files if date ranges provided)
         (dd_pre_24_sales, dd_pre_24_payouts, dd_pre_24_orders, dd_post_24_sales, dd_post_24_payouts, dd_post_24_orders,
-         dd_pre_25_sales, dd_pre_25_payouts, dd_pre_25_orders, dd_post_25_sales, dd_post_25_payouts, dd_post_25_orders) = load_and_aggregate_dd_data(
-            excluded_dates=excluded_dates,
-            pre_start_date=pre_start,
-            pre_end_date=pre_end,
-            post_start_date=post_start,
-            post_end_date=post_end,
-            dd_data_path=dd_data_path
-        )
+         dd_pre_25_sales, dd_pre_25_payouts, dd_pre_25_orders, dd_post_25_sales, dd_post_25_payouts, dd_post_25_orders) = dd_periods
         dd_sales_df, dd_payouts_df, dd_orders_df = process_data(dd_pre_24_sales, dd_pre_24_payouts, dd_pre_24_orders, dd_post_24_sales, dd_post_24_payouts, dd_post_24_orders,
                                                                   dd_pre_25_sales, dd_pre_25_payouts, dd_pre_25_orders, dd_post_25_sales, dd_post_25_payouts, dd_post_25_orders)
         
@@ -583,14 +573,14 @@ def main():
     
     # Initialize store selection with all stores by default (before sidebar)
     if not dd_sales_df.empty:
-        all_dd_stores = sorted(dd_sales_df['Store ID'].unique().tolist())
+        all_dd_stores = sorted_store_ids(dd_sales_df)
         if "selected_stores_DoorDash" not in st.session_state or len(st.session_state.get("selected_stores_DoorDash", [])) == 0:
-            st.session_state["selected_stores_DoorDash"] = all_dd_stores.copy()
+            st.session_state["selected_stores_DoorDash"] = frozenset(all_dd_stores)
     
     if not ue_sales_df.empty:
-        all_ue_stores = sorted(ue_sales_df['Store ID'].unique().tolist())
+        all_ue_stores = sorted_store_ids(ue_sales_df)
         if "selected_stores_UberEats" not in st.session_state or len(st.session_state.get("selected_stores_UberEats", [])) == 0:
-            st.session_state["selected_stores_UberEats"] = all_ue_stores.copy()
+            st.session_state["selected_stores_UberEats"] = frozenset(all_ue_stores)
     
     # Sidebar for store selection, date ranges, and date exclusion
     with st.sidebar:
@@ -885,7 +875,8 @@ def main():
     # Build Merchant Store IDs / Markups table (export only, not shown in Streamlit)
     dd_stores_list = st.session_state.get("selected_stores_DoorDash", []) or []
     ue_stores_list = st.session_state.get("selected_stores_UberEats", []) or []
-    all_store_ids = list(dict.fromkeys([str(s) for s in dd_stores_list] + [str(s) for s in ue_stores_list]))
+    # Selections are frozensets, so sort them for a stable row order
+    all_store_ids = list(dict.fromkeys(sorted(str(s) for s in dd_stores_list) + sorted(str(s) for s in ue_stores_list)))
     store_ids_markups_df = pd.DataFrame({
         "Merchant Store IDs": all_store_ids,
         "Markups": [""] * len(all_store_ids)
@@ -1069,11 +1060,9 @@ def main():
             st.subheader("Pre vs Post (Store-Level)")
             combined_store1_display = combined_store_table1.reset_index() if combined_store_table1.index.name == 'Store ID' else combined_store_table1.copy()
             if 'Pre' in combined_store1_display.columns and 'Post' in combined_store1_display.columns:
-                combined_store1_display = combined_store1_display[
-                    (combined_store1_display['Store ID'].notna() if 'Store ID' in combined_store1_display.columns else True) &
-                    (combined_store1_display['Store ID'] != '' if 'Store ID' in combined_store1_display.columns else True) &
-                    ((combined_store1_display['Pre'].fillna(0) != 0) | (combined_store1_display['Post'].fillna(0) != 0))
-                ].copy()
+                if 'Store ID' in combined_store1_display.columns:
+                    combined_store1_display = combined_store1_display[combined_store1_display['Store ID'].notna() & (combined_store1_display['Store ID'] != '')]
+                combined_store1_display = drop_empty_rows(combined_store1_display, ['Pre', 'Post'])
             if not combined_store1_display.empty and 'Pre' in combined_store1_display.columns:
                 if 'Store ID' in combined_store1_display.columns:
                     combined_store1_display = combined_store1_display.reset_index(drop=True)
@@ -1099,11 +1088,9 @@ def main():
             st.subheader("Year-over-Year (Store-Level)")
             combined_store2_display = combined_store_table2.reset_index() if combined_store_table2.index.name == 'Store ID' else combined_store_table2.copy()
             if 'last year-post' in combined_store2_display.columns and 'post' in combined_store2_display.columns:
-                combined_store2_display = combined_store2_display[
-                    (combined_store2_display['Store ID'].notna() if 'Store ID' in combined_store2_display.columns else True) &
-                    (combined_store2_display['Store ID'] != '' if 'Store ID' in combined_store2_display.columns else True) &
-                    ((combined_store2_display['last year-post'].fillna(0) != 0) | (combined_store2_display['post'].fillna(0) != 0))
-                ].copy()
+                if 'Store ID' in combined_store2_display.columns:
+                    combined_store2_display = combined_store2_display[combined_store2_display['Store ID'].notna() & (combined_store2_display['Store ID'] != '')]
+                combined_store2_display = drop_empty_rows(combined_store2_display, ['last year-post', 'post'])
             if not combined_store2_display.empty:
                 combined_store2_display = combined_store2_display.reset_index(drop=True) if 'Store ID' in combined_store2_display.columns else combined_store2_display
                 if 'last year-post' in combined_store2_display.columns:
@@ -1141,83 +1128,15 @@ def main():
     # 4. Combined Summary Tables
     st.markdown('<div class="todc-section-header"><span class="todc-badge todc-badge-combined">Combined</span> Summary Analysis</div>', unsafe_allow_html=True)
     
-    # Format Table 1
-    combined_summary1_display = combined_summary1.copy()
-    # Convert columns to object type to avoid dtype warnings when assigning formatted strings
-    for col in combined_summary1_display.columns:
-        combined_summary1_display[col] = combined_summary1_display[col].astype(object)
-    
-    for idx in combined_summary1_display.index:
-        metric = idx
-        if metric == 'Orders' or metric == 'New Customers':
-            # Orders: format as integer string
-            combined_summary1_display.loc[idx, 'Pre'] = f"{int(round(combined_summary1.loc[idx, 'Pre'])):,}"
-            combined_summary1_display.loc[idx, 'Post'] = f"{int(round(combined_summary1.loc[idx, 'Post'])):,}"
-            combined_summary1_display.loc[idx, 'PrevsPost'] = f"{int(round(combined_summary1.loc[idx, 'PrevsPost'])):,}"
-            combined_summary1_display.loc[idx, 'LastYear Pre vs Post'] = f"{int(round(combined_summary1.loc[idx, 'LastYear Pre vs Post'])):,}"
-        elif metric == 'Profitability':
-            # Profitability: format as percentage
-            combined_summary1_display.loc[idx, 'Pre'] = f"{combined_summary1.loc[idx, 'Pre']:.1f}%"
-            combined_summary1_display.loc[idx, 'Post'] = f"{combined_summary1.loc[idx, 'Post']:.1f}%"
-            combined_summary1_display.loc[idx, 'PrevsPost'] = f"{combined_summary1.loc[idx, 'PrevsPost']:.1f}%"
-            combined_summary1_display.loc[idx, 'LastYear Pre vs Post'] = f"{combined_summary1.loc[idx, 'LastYear Pre vs Post']:.1f}%"
-        elif metric == 'Average Check':
-            # Average Check: format as dollars
-            combined_summary1_display.loc[idx, 'Pre'] = f"${combined_summary1.loc[idx, 'Pre']:,.1f}"
-            combined_summary1_display.loc[idx, 'Post'] = f"${combined_summary1.loc[idx, 'Post']:,.1f}"
-            combined_summary1_display.loc[idx, 'PrevsPost'] = f"${combined_summary1.loc[idx, 'PrevsPost']:,.1f}"
-            combined_summary1_display.loc[idx, 'LastYear Pre vs Post'] = f"${combined_summary1.loc[idx, 'LastYear Pre vs Post']:,.1f}"
-        else:
-            combined_summary1_display.loc[idx, 'Pre'] = f"${combined_summary1.loc[idx, 'Pre']:,.1f}"
-            combined_summary1_display.loc[idx, 'Post'] = f"${combined_summary1.loc[idx, 'Post']:,.1f}"
-            combined_summary1_display.loc[idx, 'PrevsPost'] = f"${combined_summary1.loc[idx, 'PrevsPost']:,.1f}"
-            combined_summary1_display.loc[idx, 'LastYear Pre vs Post'] = f"${combined_summary1.loc[idx, 'LastYear Pre vs Post']:,.1f}"
-        combined_summary1_display.loc[idx, 'Growth%'] = f"{combined_summary1.loc[idx, 'Growth%']:.1f}%"
-    
-    # Ensure all columns are string type for Arrow compatibility
-    for col in combined_summary1_display.columns:
-        combined_summary1_display[col] = combined_summary1_display[col].astype(str)
-    
-    if 'LastYear Pre vs Post' in combined_summary1_display.columns:
-        combined_summary1_display = combined_summary1_display.rename(columns={'LastYear Pre vs Post': 'LY Pre/Post'})
-    
-    # Format Table 2
-    combined_summary2_display = combined_summary2.copy()
-    # Convert columns to object type to avoid dtype warnings when assigning formatted strings
-    for col in combined_summary2_display.columns:
-        combined_summary2_display[col] = combined_summary2_display[col].astype(object)
-    
-    for idx in combined_summary2_display.index:
-        metric = idx
-        if metric == 'Orders' or metric == 'New Customers':
-            # Orders: format as integer string
-            combined_summary2_display.loc[idx, 'last year-post'] = f"{int(round(combined_summary2.loc[idx, 'last year-post'])):,}"
-            combined_summary2_display.loc[idx, 'post'] = f"{int(round(combined_summary2.loc[idx, 'post'])):,}"
-            combined_summary2_display.loc[idx, 'YoY'] = f"{int(round(combined_summary2.loc[idx, 'YoY'])):,}"
-        elif metric == 'Profitability':
-            # Profitability: format as percentage
-            combined_summary2_display.loc[idx, 'last year-post'] = f"{combined_summary2.loc[idx, 'last year-post']:.1f}%"
-            combined_summary2_display.loc[idx, 'post'] = f"{combined_summary2.loc[idx, 'post']:.1f}%"
-            combined_summary2_display.loc[idx, 'YoY'] = f"{combined_summary2.loc[idx, 'YoY']:.1f}%"
-        elif metric == 'Average Check':
-            # Average Check: format as dollars
-            combined_summary2_display.loc[idx, 'last year-post'] = f"${combined_summary2.loc[idx, 'last year-post']:,.1f}"
-            combined_summary2_display.loc[idx, 'post'] = f"${combined_summary2.loc[idx, 'post']:,.1f}"
-            combined_summary2_display.loc[idx, 'YoY'] = f"${combined_summary2.loc[idx, 'YoY']:,.1f}"
-        else:
-            combined_summary2_display.loc[idx, 'last year-post'] = f"${combined_summary2.loc[idx, 'last year-post']:,.1f}"
-            combined_summary2_display.loc[idx, 'post'] = f"${combined_summary2.loc[idx, 'post']:,.1f}"
-            combined_summary2_display.loc[idx, 'YoY'] = f"${combined_summary2.loc[idx, 'YoY']:,.1f}"
-        combined_summary2_display.loc[idx, 'YoY%'] = f"{combined_summary2.loc[idx, 'YoY%']:.1f}%"
-    
-    # Ensure all columns are string type for Arrow compatibility
-    for col in combined_summary2_display.columns:
-        combined_summary2_display[col] = combined_summary2_display[col].astype(str)
-    
-    if 'last year-post' in combined_summary2_display.columns:
-        combined_summary2_display = combined_summary2_display.rename(columns={'last year-post': 'LY Post'})
-    if 'post' in combined_summary2_display.columns:
-        combined_summary2_display = combined_summary2_display.rename(columns={'post': 'Post'})
+    # Format both tables on render; the summary values stay numeric
+    combined_summary1_display = style_summary_table(
+        combined_summary1.rename(columns={'LastYear Pre vs Post': 'LY Pre/Post'}),
+        ['Pre', 'Post', 'PrevsPost', 'LY Pre/Post'], 'Growth%'
+    )
+    combined_summary2_display = style_summary_table(
+        combined_summary2.rename(columns={'last year-post': 'LY Post', 'post': 'Post'}),
+        ['LY Post', 'Post', 'YoY'], 'YoY%'
+    )
 
     combined_sum_left, combined_sum_right = st.columns(2)
     with combined_sum_left:
@@ -1,4 +1,5 @@
 """Configuration constants and paths"""
+import os
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parent
@@ -16,3 +17,6 @@ UE_MKT_PRE_24 = ROOT_DIR / "ue-mkt-pre-24.csv"
 UE_MKT_POST_24 = ROOT_DIR / "ue-mkt-post-24.csv"
 UE_MKT_PRE_25 = ROOT_DIR / "ue-mkt-pre-25.csv"
 UE_MKT_POST_25 = ROOT_DIR / "ue-mkt-post-25.csv"
+
+# Experimental: combine DD and UE store tables with Polars instead of pandas (USE_POLARS=1, needs polars installed)
+USE_POLARS = os.environ.get("USE_POLARS", "0") == "1"
@@ -3,7 +3,13 @@ import pandas as pd
 import streamlit as st
 from pathlib import Path
 from config import DD_DATA_MASTER, UE_DATA_MASTER, ROOT_DIR
-from utils import filter_master_file_by_date_range, normalize_store_id_column, filter_excluded_dates
+from utils import filter_master_file_by_date_range, normalize_store_id_column, UE_DATE_COLUMN_VARIATIONS
+
+# Columns process_master_file_for_dd reads from the DD master file (the date column is added by the loader)
+DD_MASTER_COLUMNS = ['Merchant store ID', 'Store ID', 'Subtotal', 'Net total',
+                     'Net total (for historical reference only)', 'DoorDash order ID']
+# Columns process_master_file_for_ue reads from the UE master file (the 9th-column date is added by the loader)
+UE_MASTER_COLUMNS = ['Store ID', 'Shop ID', 'Sales (excl. tax)', 'Total payout', 'Order ID']
 
 
 def process_master_file_for_dd(file_path, start_date, end_date, excluded_dates=None):
@@ -24,7 +30,8 @@ def process_master_file_for_dd(file_path, start_date, end_date, excluded_dates=N
         # Try multiple variations: "Timestamp local date", "Timestamp Local Date", "Date", etc.
         date_col_variations = ['Timestamp local date', 'Timestamp Local Date', 'Timestamp Local date', 
                               'timestamp local date', 'Date', 'date', 'Timestamp', 'timestamp']
-        df = filter_master_file_by_date_range(file_path, start_date, end_date, date_col_variations, excluded_dates)
+        df = filter_master_file_by_date_range(file_path, start_date, end_date, date_col_variations, excluded_dates,
+                                              usecols=DD_MASTER_COLUMNS)
         
         if df.empty:
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
@@ -102,44 +109,10 @@ def process_master_file_for_ue(file_path, start_date, end_date, excluded_dates=N
         Tuple of (sales_agg, payout_agg, orders_agg) DataFrames
     """
     try:
-        # For UE files: directly use 9th column (index 8) for date - no variation matching
-        # UE files have headers in row 2 (0-indexed row 1)
-        df = pd.read_csv(file_path, skiprows=[0], header=0)
-        df.columns = df.columns.str.strip()
-        
-        # Use 9th column (index 8) as date column
-        if len(df.columns) <= 8:
-            st.error(f"UE file {file_path.name} has fewer than 9 columns. Available columns: {list(df.columns)}")
-            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-        
-        date_col = df.columns[8]  # 9th column
-        
-        # Parse dates - UE files always use MM/DD/YYYY format
-        df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
-        # Fall back to auto parsing only if format parsing fails
-        if df[date_col].isna().any():
-            mask_na = df[date_col].isna()
-            df.loc[mask_na, date_col] = pd.to_datetime(df.loc[mask_na, date_col], errors='coerce')
-        
-        df = df.dropna(subset=[date_col])
-        
-        # Parse start and end dates
-        if isinstance(start_date, str):
-            start_dt = pd.to_datetime(start_date, format='%m/%d/%Y')
-        else:
-            start_dt = pd.to_datetime(start_date)
-        
-        if isinstance(end_date, str):
-            end_dt = pd.to_datetime(end_date, format='%m/%d/%Y')
-        else:
-            end_dt = pd.to_datetime(end_date)
-        
-        # Filter by date range
-        df = df[(df[date_col] >= start_dt) & (df[date_col] <= end_dt)]
-        
-        # Apply excluded dates filter
-        if excluded_dates:
-            df = filter_excluded_dates(df, date_col, excluded_dates)
+        # UE files use the 9th column (index 8) as the date column and have headers in row 2;
+        # the shared loader caches the read + date parsing, so each period only slices it
+        df = filter_master_file_by_date_range(file_path, start_date, end_date, UE_DATE_COLUMN_VARIATIONS, excluded_dates,
+                                              usecols=UE_MASTER_COLUMNS)
         
         if df.empty:
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
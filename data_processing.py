@@ -1,4 +1,7 @@
 """Data processing functions for aggregating and processing data"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import streamlit as st
 from pathlib import Path
@@ -8,7 +11,13 @@ from config import (
     UE_MKT_PRE_24, UE_MKT_POST_24, UE_MKT_PRE_25, UE_MKT_POST_25
 )
 from data_loading import process_master_file_for_dd, process_master_file_for_ue
-from utils import normalize_store_id_column, filter_excluded_dates
+from utils import normalize_store_id_column, filter_excluded_dates, categorize_store_ids, strip_column_names
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+    # Not running under Streamlit (e.g. the Slack report bot)
+    add_script_run_ctx = get_script_run_ctx = None
 
 
 def get_last_year_dates(start_date, end_date):
@@ -40,6 +49,35 @@ def get_last_year_dates(start_date, end_date):
     return last_year_start.strftime('%m/%d/%Y'), last_year_end.strftime('%m/%d/%Y')
 
 
+def _load_periods(process_fn, file_path, periods, excluded_dates):
+    """Run process_fn(file_path, start, end, excluded_dates) for each (start, end) period, in order
+
+    The periods are loaded one after another: the master file is read and parsed once
+    (cached by filter_master_file_by_date_range) and each period is a slice of that frame.
+    """
+    return [process_fn(file_path, start, end, excluded_dates) for start, end in periods]
+
+
+def run_loads(*loads):
+    """
+    Run independent loads of different master files (zero-argument callables) and return their results in order.
+    
+    Under Streamlit the loads run on a thread pool, with the script context attached so their
+    st.error/st.warning messages still reach the page. Elsewhere (e.g. the Slack report bot)
+    they run one after another, so only one master file is being parsed at a time.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True) if get_script_run_ctx else None
+    if ctx is None or len(loads) < 2:
+        return [load() for load in loads]
+    
+    def run(load):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return load()
+    
+    with ThreadPoolExecutor(max_workers=len(loads)) as executor:
+        return list(executor.map(run, loads))
+
+
 def load_and_aggregate_ue_data(excluded_dates=None, pre_start_date=None, pre_end_date=None, post_start_date=None, post_end_date=None, ue_data_path=None):
     """
     Load UE data from ue-data.csv master file and aggregate Sales (excl. tax) by Store ID.
@@ -80,25 +118,14 @@ def load_and_aggregate_ue_data(excluded_dates=None, pre_start_date=None, pre_end
     pre_24_start, pre_24_end = get_last_year_dates(pre_start_date, pre_end_date)
     post_24_start, post_24_end = get_last_year_dates(post_start_date, post_end_date)
     
-    # Process for last year's Pre period (for LastYear_Pre_vs_Post calculation)
-    pre_24_sales, pre_24_payouts, pre_24_orders = process_master_file_for_ue(
-        ue_data_path, pre_24_start, pre_24_end, excluded_dates
-    )
-    
-    # Process for current year's Pre period
-    pre_25_sales, pre_25_payouts, pre_25_orders = process_master_file_for_ue(
-        ue_data_path, pre_start_date, pre_end_date, excluded_dates
-    )
-    
-    # For YoY: post24 = last year's post dates, post25 = current post dates
-    post_24_sales, post_24_payouts, post_24_orders = process_master_file_for_ue(
-        ue_data_path, post_24_start, post_24_end, excluded_dates
-    )
-    
-    # post25 = current post dates
-    post_25_sales, post_25_payouts, post_25_orders = process_master_file_for_ue(
-        ue_data_path, post_start_date, post_end_date, excluded_dates
-    )
+    # The four periods are slices of the same master file: pre24 (for LastYear_Pre_vs_Post), pre25, post24 (for YoY) and post25
+    (pre_24_sales, pre_24_payouts, pre_24_orders), (pre_25_sales, pre_25_payouts, pre_25_orders), \
+        (post_24_sales, post_24_payouts, post_24_orders), (post_25_sales, post_25_payouts, post_25_orders) = _load_periods(
+            process_master_file_for_ue, ue_data_path,
+            [(pre_24_start, pre_24_end), (pre_start_date, pre_end_date),
+             (post_24_start, post_24_end), (post_start_date, post_end_date)],
+            excluded_dates
+        )
     
     return (pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, post_24_payouts, post_24_orders,
             pre_25_sales, pre_25_payouts, pre_25_orders, post_25_sales, post_25_payouts, post_25_orders)
@@ -144,25 +171,14 @@ def load_and_aggregate_dd_data(excluded_dates=None, pre_start_date=None, pre_end
     pre_24_start, pre_24_end = get_last_year_dates(pre_start_date, pre_end_date)
     post_24_start, post_24_end = get_last_year_dates(post_start_date, post_end_date)
     
-    # Process for last year's Pre period (for LastYear_Pre_vs_Post calculation)
-    pre_24_sales, pre_24_payouts, pre_24_orders = process_master_file_for_dd(
-        dd_data_path, pre_24_start, pre_24_end, excluded_dates
-    )
-    
-    # Process for current year's Pre period
-    pre_25_sales, pre_25_payouts, pre_25_orders = process_master_file_for_dd(
-        dd_data_path, pre_start_date, pre_end_date, excluded_dates
-    )
-    
-    # For YoY: post24 = last year's post dates, post25 = current post dates
-    post_24_sales, post_24_payouts, post_24_orders = process_master_file_for_dd(
-        dd_data_path, post_24_start, post_24_end, excluded_dates
-    )
-    
-    # post25 = current post dates
-    post_25_sales, post_25_payouts, post_25_orders = process_master_file_for_dd(
-        dd_data_path, post_start_date, post_end_date, excluded_dates
-    )
+    # The four periods are slices of the same master file: pre24 (for LastYear_Pre_vs_Post), pre25, post24 (for YoY) and post25
+    (pre_24_sales, pre_24_payouts, pre_24_orders), (pre_25_sales, pre_25_payouts, pre_25_orders), \
+        (post_24_sales, post_24_payouts, post_24_orders), (post_25_sales, post_25_payouts, post_25_orders) = _load_periods(
+            process_master_file_for_dd, dd_data_path,
+            [(pre_24_start, pre_24_end), (pre_start_date, pre_end_date),
+             (post_24_start, post_24_end), (post_start_date, post_end_date)],
+            excluded_dates
+        )
     
     return (pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, post_24_payouts, post_24_orders,
             pre_25_sales, pre_25_payouts, pre_25_orders, post_25_sales, post_25_payouts, post_25_orders)
@@ -234,7 +250,7 @@ def load_and_aggregate_new_customers(excluded_dates=None, pre_start_date=None, p
         for promotion_file in promotion_files:
                 try:
                     df = pd.read_csv(promotion_file)
-                    df.columns = df.columns.str.strip()
+                    strip_column_names(df)
                     
                     # Check for required columns
                     if 'Date' not in df.columns:
@@ -292,11 +308,13 @@ def load_and_aggregate_new_customers(excluded_dates=None, pre_start_date=None, p
                         end_dt = parse_date(end_date)
                         if pd.isna(start_dt) or pd.isna(end_dt):
                             continue
-                        # Compare by calendar date so end_date is fully inclusive (no time truncation)
-                        start_date_only = start_dt.date() if hasattr(start_dt, 'date') else start_dt
-                        end_date_only = end_dt.date() if hasattr(end_dt, 'date') else end_dt
-                        df_dates = df['Date'].dt.date
-                        date_mask = (df_dates >= start_date_only) & (df_dates <= end_date_only)
+                        # Compare by calendar date so end_date is fully inclusive (no time truncation),
+                        # as integer day numbers (datetime64[D]) rather than per-row timestamps or date objects
+                        df_dates = df['Date']
+                        if isinstance(df_dates.dtype, pd.DatetimeTZDtype):
+                            df_dates = df_dates.dt.tz_localize(None)
+                        days = df_dates.to_numpy().astype('datetime64[D]')
+                        date_mask = (days >= np.datetime64(start_dt.date(), 'D')) & (days <= np.datetime64(end_dt.date(), 'D'))
                         df = df[date_mask]
                     
                     # Apply excluded dates filter
@@ -404,7 +422,7 @@ def load_and_aggregate_new_customers(excluded_dates=None, pre_start_date=None, p
             if not file_path.exists():
                 return pd.DataFrame()
             df = pd.read_csv(file_path)
-            df.columns = df.columns.str.strip()
+            strip_column_names(df)
             
             # Normalize store ID column (check for both 'Store ID' and 'Shop ID')
             df, store_col = normalize_store_id_column(df)
@@ -454,7 +472,7 @@ def load_and_aggregate_new_customers(excluded_dates=None, pre_start_date=None, p
         Note: Date filtering is NOT applied to UE marketing files per requirements"""
         try:
             df = pd.read_csv(file_path)
-            df.columns = df.columns.str.strip()
+            strip_column_names(df)
             
             # Date filtering is NOT applied to UE marketing files
             
@@ -500,7 +518,7 @@ def load_and_aggregate_new_customers(excluded_dates=None, pre_start_date=None, p
             if not file_path.exists():
                 return 0
             df = pd.read_csv(file_path)
-            df.columns = df.columns.str.strip()
+            strip_column_names(df)
             
             # Date filtering is NOT applied to UE marketing files
             
@@ -520,6 +538,21 @@ def load_and_aggregate_new_customers(excluded_dates=None, pre_start_date=None, p
             ue_pre_24_total, ue_post_24_total, ue_pre_25_total, ue_post_25_total)
 
 
+def _pct_of(change, base):
+    """change / base * 100 in one pass; where base is 0 the change itself is divided by 1, as before"""
+    change = change.to_numpy(dtype=float)
+    base = base.to_numpy(dtype=float)
+    return np.divide(change, base, out=change.copy(), where=base != 0) * 100
+
+
+def _numeric_columns(df, columns, decimals=None):
+    """Coerce the given columns (those present) to numbers, NaN as 0, in one frame-level assignment"""
+    columns = [col for col in columns if col in df.columns]
+    if columns:
+        values = df[columns].apply(pd.to_numeric, errors='coerce').fillna(0)
+        df[columns] = values if decimals is None else values.round(decimals)
+
+
 def process_data(pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, post_24_payouts, post_24_orders,
                  pre_25_sales, pre_25_payouts, pre_25_orders, post_25_sales, post_25_payouts, post_25_orders):
     """Process and merge data from all four files for sales, payouts, and orders"""
@@ -558,9 +591,7 @@ def process_data(pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, pos
         sales_result = sales_result.merge(post_25_s, on='Store ID', how='outer')
     sales_result = sales_result.fillna(0)
     # Ensure numeric columns are numeric type
-    for col in ['pre_24', 'post_24', 'pre_25', 'post_25']:
-        if col in sales_result.columns:
-            sales_result[col] = pd.to_numeric(sales_result[col], errors='coerce').fillna(0)
+    _numeric_columns(sales_result, ['pre_24', 'post_24', 'pre_25', 'post_25'])
     
     # Process Payouts data
     pre_24_p = pre_24_payouts.rename(columns={'Payouts': 'pre_24'}) if not pre_24_payouts.empty else pd.DataFrame(columns=['Store ID', 'pre_24'])
@@ -596,9 +627,7 @@ def process_data(pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, pos
         payouts_result = payouts_result.merge(post_25_p, on='Store ID', how='outer')
     payouts_result = payouts_result.fillna(0)
     # Ensure numeric columns are numeric type
-    for col in ['pre_24', 'post_24', 'pre_25', 'post_25']:
-        if col in payouts_result.columns:
-            payouts_result[col] = pd.to_numeric(payouts_result[col], errors='coerce').fillna(0)
+    _numeric_columns(payouts_result, ['pre_24', 'post_24', 'pre_25', 'post_25'])
     
     # Process Orders data
     pre_24_o = pre_24_orders.rename(columns={'Orders': 'pre_24'}) if not pre_24_orders.empty else pd.DataFrame(columns=['Store ID', 'pre_24'])
@@ -634,9 +663,7 @@ def process_data(pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, pos
         orders_result = orders_result.merge(post_25_o, on='Store ID', how='outer')
     orders_result = orders_result.fillna(0)
     # Ensure numeric columns are numeric type
-    for col in ['pre_24', 'post_24', 'pre_25', 'post_25']:
-        if col in orders_result.columns:
-            orders_result[col] = pd.to_numeric(orders_result[col], errors='coerce').fillna(0)
+    _numeric_columns(orders_result, ['pre_24', 'post_24', 'pre_25', 'post_25'])
     
     # Ensure all required columns exist for calculations and are numeric
     required_cols = ['pre_24', 'post_24', 'pre_25', 'post_25']
@@ -660,8 +687,8 @@ def process_data(pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, pos
     sales_result['YoY'] = pd.to_numeric(sales_result['post_25'], errors='coerce').fillna(0) - pd.to_numeric(sales_result['post_24'], errors='coerce').fillna(0)
     pre_25_numeric = pd.to_numeric(sales_result['pre_25'], errors='coerce').fillna(0)
     post_24_numeric = pd.to_numeric(sales_result['post_24'], errors='coerce').fillna(0)
-    sales_result['Growth%'] = (sales_result['PrevsPost'] / pre_25_numeric.replace(0, 1) * 100).replace([float('inf'), -float('inf')], 0).fillna(0)
-    sales_result['YoY%'] = (sales_result['YoY'] / post_24_numeric.replace(0, 1) * 100).replace([float('inf'), -float('inf')], 0).fillna(0)
+    sales_result['Growth%'] = _pct_of(sales_result['PrevsPost'], pre_25_numeric)
+    sales_result['YoY%'] = _pct_of(sales_result['YoY'], post_24_numeric)
     
     # Calculate metrics for Payouts - ensure numeric types
     payouts_result['PrevsPost'] = pd.to_numeric(payouts_result['post_25'], errors='coerce').fillna(0) - pd.to_numeric(payouts_result['pre_25'], errors='coerce').fillna(0)
@@ -669,8 +696,8 @@ def process_data(pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, pos
     payouts_result['YoY'] = pd.to_numeric(payouts_result['post_25'], errors='coerce').fillna(0) - pd.to_numeric(payouts_result['post_24'], errors='coerce').fillna(0)
     pre_25_payouts_numeric = pd.to_numeric(payouts_result['pre_25'], errors='coerce').fillna(0)
     post_24_payouts_numeric = pd.to_numeric(payouts_result['post_24'], errors='coerce').fillna(0)
-    payouts_result['Growth%'] = (payouts_result['PrevsPost'] / pre_25_payouts_numeric.replace(0, 1) * 100).replace([float('inf'), -float('inf')], 0).fillna(0)
-    payouts_result['YoY%'] = (payouts_result['YoY'] / post_24_payouts_numeric.replace(0, 1) * 100).replace([float('inf'), -float('inf')], 0).fillna(0)
+    payouts_result['Growth%'] = _pct_of(payouts_result['PrevsPost'], pre_25_payouts_numeric)
+    payouts_result['YoY%'] = _pct_of(payouts_result['YoY'], post_24_payouts_numeric)
     
     # Calculate metrics for Orders - ensure numeric types
     orders_result['PrevsPost'] = pd.to_numeric(orders_result['post_25'], errors='coerce').fillna(0) - pd.to_numeric(orders_result['pre_25'], errors='coerce').fillna(0)
@@ -678,18 +705,17 @@ def process_data(pre_24_sales, pre_24_payouts, pre_24_orders, post_24_sales, pos
     orders_result['YoY'] = pd.to_numeric(orders_result['post_25'], errors='coerce').fillna(0) - pd.to_numeric(orders_result['post_24'], errors='coerce').fillna(0)
     pre_25_orders_numeric = pd.to_numeric(orders_result['pre_25'], errors='coerce').fillna(0)
     post_24_orders_numeric = pd.to_numeric(orders_result['post_24'], errors='coerce').fillna(0)
-    orders_result['Growth%'] = (orders_result['PrevsPost'] / pre_25_orders_numeric.replace(0, 1) * 100).replace([float('inf'), -float('inf')], 0).fillna(0)
-    orders_result['YoY%'] = (orders_result['YoY'] / post_24_orders_numeric.replace(0, 1) * 100).replace([float('inf'), -float('inf')], 0).fillna(0)
+    orders_result['Growth%'] = _pct_of(orders_result['PrevsPost'], pre_25_orders_numeric)
+    orders_result['YoY%'] = _pct_of(orders_result['YoY'], post_24_orders_numeric)
     
     # Round numeric columns to 1 decimal place - ensure they're numeric first
     numeric_cols = ['pre_24', 'post_24', 'pre_25', 'post_25', 'PrevsPost', 'LastYear_Pre_vs_Post', 'YoY', 'Growth%', 'YoY%']
-    for col in numeric_cols:
-        if col in sales_result.columns:
-            sales_result[col] = pd.to_numeric(sales_result[col], errors='coerce').fillna(0).round(1)
-        if col in payouts_result.columns:
-            payouts_result[col] = pd.to_numeric(payouts_result[col], errors='coerce').fillna(0).round(1)
-        if col in orders_result.columns:
-            orders_result[col] = pd.to_numeric(orders_result[col], errors='coerce').fillna(0).round(1)
+    for result in (sales_result, payouts_result, orders_result):
+        _numeric_columns(result, numeric_cols, decimals=1)
+    
+    # Store IDs are final after the merges; store them as categoricals for the table filters
+    for result in (sales_result, payouts_result, orders_result):
+        categorize_store_ids(result)
     
     return sales_result, payouts_result, orders_result
 
@@ -748,8 +774,7 @@ def process_new_customers_data(pre_24_nc, post_24_nc, pre_25_nc, post_25_nc, is_
     nc_result = nc_result.fillna(0)
     
     # Ensure numeric columns are numeric type before calculations
-    for col in required_cols:
-        nc_result[col] = pd.to_numeric(nc_result[col], errors='coerce').fillna(0)
+    _numeric_columns(nc_result, required_cols)
     
     # Calculate metrics - ensure numeric types
     nc_result['PrevsPost'] = pd.to_numeric(nc_result['post_25'], errors='coerce').fillna(0) - pd.to_numeric(nc_result['pre_25'], errors='coerce').fillna(0)
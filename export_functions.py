@@ -9,9 +9,11 @@ from openpyxl.styles import Alignment, Font
 from openpyxl.utils import get_column_letter
 from config import ROOT_DIR
 from gdrive_utils import get_drive_manager
-from utils import normalize_store_id_column, filter_master_file_by_date_range, UE_DATE_COLUMN_VARIATIONS, DD_DATE_COLUMN_VARIATIONS
+from utils import (normalize_store_id_column, filter_master_file_by_date_range, strip_column_names, parse_date_column,
+                   UE_DATE_COLUMN_VARIATIONS, DD_DATE_COLUMN_VARIATIONS)
 from table_generation import create_summary_tables
 from data_processing import get_last_year_dates
+from data_loading import DD_MASTER_COLUMNS
 
 
 def export_to_excel(dd_table1, dd_table2, ue_table1, ue_table2, 
@@ -483,7 +485,7 @@ def create_date_export(dd_pre_24_path, dd_post_24_path, dd_pre_25_path, dd_post_
         """Process DD file and return data pivoted by date"""
         try:
             df = pd.read_csv(file_path)
-            df.columns = df.columns.str.strip()
+            strip_column_names(df)
             
             # Use "Timestamp local date" for DD
             date_col = 'Timestamp local date'
@@ -561,7 +563,7 @@ def create_date_export(dd_pre_24_path, dd_post_24_path, dd_pre_25_path, dd_post_
         """Process UE file and return data pivoted by date"""
         try:
             df = pd.read_csv(file_path, skiprows=[0], header=0)
-            df.columns = df.columns.str.strip()
+            strip_column_names(df)
             
             # Normalize store ID column (check for both 'Store ID' and 'Shop ID')
             df, store_col = normalize_store_id_column(df)
@@ -582,14 +584,8 @@ def create_date_export(dd_pre_24_path, dd_post_24_path, dd_pre_25_path, dd_post_
                 return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
             
             # Process ALL data - no filtering by selected stores for date export
-            # Convert date - Store original values before parsing
-            original_dates = df[date_col].copy()
-            # UE files always use MM/DD/YYYY format
-            df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
-            # Fall back to auto parsing only if format parsing fails
-            if df[date_col].isna().any():
-                mask_na = df[date_col].isna()
-                df.loc[mask_na, date_col] = pd.to_datetime(original_dates.loc[mask_na], errors='coerce')
+            # Convert date - UE files use MM/DD/YYYY, other formats are parsed as a fallback
+            df[date_col] = parse_date_column(df[date_col])
             df = df.dropna(subset=[date_col, store_col])
             
             if len(df) == 0:
@@ -720,10 +716,12 @@ def create_date_export_from_master_files(dd_data_path, ue_data_path, pre_start_d
         
         # Process in order: DD_25, UE_25, DD_24, UE_24 (each: Sales, Payouts, Orders)
         if dd_data_path and Path(dd_data_path).exists():
-            dd_pre_25 = filter_master_file_by_date_range(Path(dd_data_path), pre_start_date, pre_end_date, DD_DATE_COLUMN_VARIATIONS, excluded_dates)
-            dd_post_25 = filter_master_file_by_date_range(Path(dd_data_path), post_start_date, post_end_date, DD_DATE_COLUMN_VARIATIONS, excluded_dates)
-            dd_pre_24 = filter_master_file_by_date_range(Path(dd_data_path), pre_24_start, pre_24_end, DD_DATE_COLUMN_VARIATIONS, excluded_dates)
-            dd_post_24 = filter_master_file_by_date_range(Path(dd_data_path), post_24_start, post_24_end, DD_DATE_COLUMN_VARIATIONS, excluded_dates)
+            # Only the columns the DD pivots aggregate; the same projection as the DD loader, so the
+            # cached master frame it already parsed is reused rather than the whole file being read again
+            dd_pre_25 = filter_master_file_by_date_range(Path(dd_data_path), pre_start_date, pre_end_date, DD_DATE_COLUMN_VARIATIONS, excluded_dates, usecols=DD_MASTER_COLUMNS)
+            dd_post_25 = filter_master_file_by_date_range(Path(dd_data_path), post_start_date, post_end_date, DD_DATE_COLUMN_VARIATIONS, excluded_dates, usecols=DD_MASTER_COLUMNS)
+            dd_pre_24 = filter_master_file_by_date_range(Path(dd_data_path), pre_24_start, pre_24_end, DD_DATE_COLUMN_VARIATIONS, excluded_dates, usecols=DD_MASTER_COLUMNS)
+            dd_post_24 = filter_master_file_by_date_range(Path(dd_data_path), post_24_start, post_24_end, DD_DATE_COLUMN_VARIATIONS, excluded_dates, usecols=DD_MASTER_COLUMNS)
         else:
             dd_pre_25 = dd_post_25 = dd_pre_24 = dd_post_24 = pd.DataFrame()
         if ue_data_path and Path(ue_data_path).exists():
@@ -806,12 +804,9 @@ def _build_period_pivots(df, platform, store_col, sales_col, payout_col, order_c
         return empty.copy(), empty.copy(), empty.copy()
     
     df = df.copy()
-    original_dates = df[date_col].copy()
+    original_dates = df[date_col]
     if platform == 'UE':
-        df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
-        if df[date_col].isna().any():
-            mask_na = df[date_col].isna()
-            df.loc[mask_na, date_col] = pd.to_datetime(original_dates.loc[mask_na], errors='coerce')
+        df[date_col] = parse_date_column(df[date_col])
     else:
         df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
         if df[date_col].isna().all():
@@ -990,14 +985,10 @@ def _add_period_sheets_to_workbook(wb, df, platform, period_name, store_col, sal
             return
         
         # Convert date column - Store original values before parsing
-        original_dates = df[date_col].copy()
+        original_dates = df[date_col]
         if platform == 'UE':
-            # UE files always use MM/DD/YYYY format
-            df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
-            # Fall back to auto parsing only if format parsing fails
-            if df[date_col].isna().any():
-                mask_na = df[date_col].isna()
-                df.loc[mask_na, date_col] = pd.to_datetime(original_dates.loc[mask_na], errors='coerce')
+            # UE files use MM/DD/YYYY; parse_date_column falls back to other formats per value
+            df[date_col] = parse_date_column(df[date_col])
         else:
             # DD files: Try MM/DD/YYYY format first (most common), then YYYY-MM-DD
             df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
@@ -1108,14 +1099,10 @@ def _create_period_excel_file(df, platform, period_name, store_col, sales_col, p
             return None
         
         # Convert date column - Store original values before parsing
-        original_dates = df[date_col].copy()
+        original_dates = df[date_col]
         if platform == 'UE':
-            # UE files always use MM/DD/YYYY format
-            df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
-            # Fall back to auto parsing only if format parsing fails
-            if df[date_col].isna().any():
-                mask_na = df[date_col].isna()
-                df.loc[mask_na, date_col] = pd.to_datetime(original_dates.loc[mask_na], errors='coerce')
+            # UE files use MM/DD/YYYY; parse_date_column falls back to other formats per value
+            df[date_col] = parse_date_column(df[date_col])
         else:
             # DD files: Try MM/DD/YYYY format first (most common), then YYYY-MM-DD
             df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
@@ -86,12 +86,10 @@ def extract_file_info(file_path, file_type):
     """
     try:
         # UE files have headers in row 2 (0-indexed row 1), DD files have headers in row 1
-        if file_type == 'ue':
-            df = pd.read_csv(file_path, skiprows=[0], header=0)
-        else:
-            df = pd.read_csv(file_path)
+        from utils import read_master_csv, strip_column_names, parse_date_column
+        df = read_master_csv(file_path, skip_first_row=(file_type == 'ue'))
         
-        df.columns = df.columns.str.strip()
+        strip_column_names(df)
         num_rows = len(df)
         
         # Determine date column based on file type
@@ -108,9 +106,8 @@ def extract_file_info(file_path, file_type):
                 st.warning(f"UE file has only {len(df.columns)} columns. Expected at least 9. Available columns: {list(df.columns)}")
                 date_col = None
         elif file_type == 'marketing':
-            possible_cols = ['Date', 'date']
             for col in df.columns:
-                if col.lower() in possible_cols:
+                if col.lower() == 'date':
                     date_col = col
                     break
         
@@ -120,15 +117,11 @@ def extract_file_info(file_path, file_type):
         if date_col and date_col in df.columns:
             try:
                 # Store original date column values before parsing
-                original_dates = df[date_col].copy()
+                original_dates = df[date_col]
                 
-                # For UE files, always use MM/DD/YYYY format
+                # UE files use MM/DD/YYYY; parse_date_column falls back to other formats per value
                 if file_type == 'ue':
-                    df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
-                    # Fall back to auto parsing only if format parsing fails
-                    if df[date_col].isna().any():
-                        mask_na = df[date_col].isna()
-                        df.loc[mask_na, date_col] = pd.to_datetime(original_dates.loc[mask_na], errors='coerce')
+                    df[date_col] = parse_date_column(df[date_col])
                 else:
                     # For DD files, try MM/DD/YYYY format first (most common), then YYYY-MM-DD
                     df[date_col] = pd.to_datetime(df[date_col], format='%m/%d/%Y', errors='coerce')
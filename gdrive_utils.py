@@ -113,18 +113,23 @@ class GoogleDriveManager:
                 drive_name = self._shared_drive_name
             
             try:
-                # List all shared drives
-                results = self.service.drives().list(
-                    pageSize=100
-                ).execute()
-                
-                drives = results.get('drives', [])
-                
-                # Find the drive by name
-                for drive in drives:
-                    if drive['name'] == drive_name:
-                        self._shared_drive_id = drive['id']
-                        return self._shared_drive_id
+                # Page through shared drives (id/name only), stopping at the first match
+                page_token = None
+                while True:
+                    results = self.service.drives().list(
+                        pageSize=100,
+                        fields='nextPageToken,drives(id,name)',
+                        pageToken=page_token
+                    ).execute()
+                    
+                    for drive in results.get('drives', []):
+                        if drive['name'] == drive_name:
+                            self._shared_drive_id = drive['id']
+                            return self._shared_drive_id
+                    
+                    page_token = results.get('nextPageToken')
+                    if not page_token:
+                        break
                 
                 raise Exception(f"Shared drive '{drive_name}' not found. Please ensure the service account has access to it.")
             
@@ -2,18 +2,65 @@
 Simple script to get the Shared Drive ID.
 Run this to find your Shared Drive ID for debugging purposes.
 """
+import argparse
+import functools
+import json
 from pathlib import Path
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-def get_shared_drive_id(drive_name="Data-Analysis-Uploads", credentials_path=None):
+# Resolved shared drive IDs are cached on disk next to this script, per credentials file and
+# drive name; run with --refresh (or pass refresh=True) to look the drive up again
+_CACHE = Path(__file__).parent / '.drive_id_cache.json'
+
+
+def _read_drive_id_cache():
+    """Read the {credentials_path: {drive_name: drive_id}} cache, returning {} if missing or unreadable"""
+    try:
+        cache = json.loads(_CACHE.read_text())
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _cached_drive_id(credentials_path, drive_name):
+    """Drive ID cached for this credentials file and drive name, or None"""
+    entries = _read_drive_id_cache().get(str(credentials_path))
+    return entries.get(drive_name) if isinstance(entries, dict) else None
+
+
+def _write_drive_id_cache(credentials_path, drive_name, drive_id):
+    """Store a resolved drive ID in the on-disk cache"""
+    cache = _read_drive_id_cache()
+    entries = cache.get(str(credentials_path))
+    if not isinstance(entries, dict):
+        entries = cache[str(credentials_path)] = {}
+    entries[drive_name] = drive_id
+    try:
+        _CACHE.write_text(json.dumps(cache, indent=2))
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=1)
+def _get_drive_service(credentials_path):
+    """Build (once per credentials file) an authenticated Drive v3 service"""
+    credentials = service_account.Credentials.from_service_account_file(
+        credentials_path,
+        scopes=['https://www.googleapis.com/auth/drive']
+    )
+    return build('drive', 'v3', credentials=credentials)
+
+
+def get_shared_drive_id(drive_name="Data-Analysis-Uploads", credentials_path=None, refresh=False):
     """
     Get the Shared Drive ID by name.
     
     Args:
         drive_name: Name of the shared drive
         credentials_path: Path to service account JSON file
+        refresh: Skip the on-disk cache and look the drive up in Google Drive
     
     Returns:
         Shared Drive ID
@@ -28,41 +75,44 @@ def get_shared_drive_id(drive_name="Data-Analysis-Uploads", credentials_path=Non
         print(f"❌ Service account credentials not found at: {credentials_path}")
         return None
     
+    cached_id = None if refresh else _cached_drive_id(credentials_path, drive_name)
+    if cached_id:
+        print(f"✅ Using cached ID for '{drive_name}': {cached_id} (run with --refresh to look it up again)")
+        return cached_id
+    
     try:
         # Authenticate
-        credentials = service_account.Credentials.from_service_account_file(
-            str(credentials_path),
-            scopes=['https://www.googleapis.com/auth/drive']
-        )
-        service = build('drive', 'v3', credentials=credentials)
+        service = _get_drive_service(str(credentials_path))
         
-        # List all shared drives
+        # Page through shared drives (only the fields we use), stopping at the first match
         print(f"🔍 Searching for shared drive: '{drive_name}'...")
-        results = service.drives().list(pageSize=100).execute()
-        
-        drives = results.get('drives', [])
+        drives_seen = 0
+        page_token = None
+        while True:
+            results = service.drives().list(
+                pageSize=100,
+                fields='nextPageToken,drives(id,name)',
+                pageToken=page_token
+            ).execute()
+            
+            for drive in results.get('drives', []):
+                drives_seen += 1
+                if drive['name'] == drive_name:
+                    print(f"✅ Found matching drive!")
+                    print(f"   Drive Name: {drive['name']}")
+                    print(f"   Drive ID:   {drive['id']}")
+                    _write_drive_id_cache(credentials_path, drive_name, drive['id'])
+                    return drive['id']
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
         
-        if not drives:
+        if drives_seen == 0:
             print("❌ No shared drives found. Make sure the service account has access to shared drives.")
             return None
         
-        print(f"\n📋 Found {len(drives)} shared drive(s):")
-        print("-" * 60)
-        
-        # Find the drive by name
-        for drive in drives:
-            print(f"  Name: {drive['name']}")
-            print(f"  ID:   {drive['id']}")
-            print(f"  Kind: {drive.get('kind', 'N/A')}")
-            print("-" * 60)
-            
-            if drive['name'] == drive_name:
-                print(f"\n✅ Found matching drive!")
-                print(f"   Drive Name: {drive['name']}")
-                print(f"   Drive ID:   {drive['id']}")
-                return drive['id']
-        
-        print(f"\n⚠️  Shared drive '{drive_name}' not found in the list above.")
+        print(f"⚠️  Shared drive '{drive_name}' not found among {drives_seen} shared drive(s).")
         print("   Please check:")
         print("   1. The drive name is correct")
         print("   2. The service account has access to the shared drive")
@@ -78,12 +128,16 @@ def get_shared_drive_id(drive_name="Data-Analysis-Uploads", credentials_path=Non
         return None
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find a Google Shared Drive ID by name")
+    parser.add_argument("--refresh", action="store_true", help="ignore the cached ID and query Google Drive")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Google Drive Shared Drive ID Finder")
     print("=" * 60)
     print()
     
-    drive_id = get_shared_drive_id()
+    drive_id = get_shared_drive_id(refresh=args.refresh)
     
     if drive_id:
         print()
@@ -1,8 +1,30 @@
 """Marketing analysis functions for Corporate vs TODC tables"""
+import os
+import tempfile
+import numpy as np
 import pandas as pd
 import streamlit as st
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
 from config import ROOT_DIR
-from utils import filter_excluded_dates
+from utils import filter_excluded_dates, normalize_excluded_dates, strip_column_names
+
+# Spend column used by each marketing file type
+MARKETING_SPEND_COLUMNS = {
+    'PROMOTION': 'Customer discounts from marketing | (Funded by you)',
+    'SPONSORED_LISTING': 'Marketing fees | (including any applicable taxes)',
+}
+
+# Parquet schema metadata key holding the (mtime_ns, size) of the CSV a cached copy was built from
+PARQUET_SOURCE_VERSION_KEY = b'source_csv_version'
+
+# Human-readable name of each marketing file type, for warnings
+MARKETING_FILE_LABELS = {
+    'PROMOTION': 'promotion',
+    'SPONSORED_LISTING': 'sponsored listing',
+}
 
 
 def find_marketing_folders(marketing_folder_path=None):
@@ -44,148 +66,187 @@ def get_marketing_file_path(marketing_dir, file_type):
     return None
 
 
-def process_marketing_promotion_files(excluded_dates=None, pre_start_date=None, pre_end_date=None, post_start_date=None, post_end_date=None, marketing_folder_path=None):
+def _as_ts(value):
+    """Normalize a MM/DD/YYYY string, date or Timestamp to a midnight pd.Timestamp"""
+    if isinstance(value, str):
+        return pd.to_datetime(value, format='%m/%d/%Y')
+    return pd.Timestamp(value).normalize()
+
+
+def _csv_version(csv_path):
+    """(mtime_ns, size) of a CSV file, encoded for the Parquet schema metadata"""
+    stat = csv_path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}".encode()
+
+
+def _parquet_source_version(parquet_path):
+    """CSV version a Parquet copy was built from, or None if it is missing, unreadable or untagged"""
+    try:
+        return (pq.read_schema(parquet_path).metadata or {}).get(PARQUET_SOURCE_VERSION_KEY)
+    except Exception:
+        return None
+
+
+def _cached_parquet(csv_path):
     """
-    Process all MARKETING_PROMOTION files and create pivot table by "Is self serve campaign".
+    Get a Parquet copy of a CSV file, rebuilding it unless it was built from this version
+    (mtime and size) of the CSV.
     
-    Returns:
-        DataFrame with rows = "Is self serve campaign" values, columns = Orders, Sales, Spend, ROAS, Cost per Order
-    """
-    marketing_dirs = find_marketing_folders(marketing_folder_path)
+    The copy is written to a temporary file in the same folder and moved into place,
+    so an interrupted or concurrent write never leaves a truncated Parquet file behind.
     
-    all_data = []
+    Args:
+        csv_path: Path to the source CSV file
     
-    for marketing_dir in marketing_dirs:
-        promotion_file = get_marketing_file_path(marketing_dir, 'PROMOTION')
-        if not promotion_file or not promotion_file.exists():
-            continue
-        
-        try:
-            df = pd.read_csv(promotion_file)
-            df.columns = df.columns.str.strip()
-            
-            # Filter by date range if provided - ONLY use POST dates for Corporate vs TODC
+    Returns:
+        Path to the Parquet file, or None if it could not be written
+    """
+    parquet_path = csv_path.with_suffix('.parquet')
+    try:
+        version = _csv_version(csv_path)
+        if _parquet_source_version(parquet_path) != version:
+            df = pd.read_csv(csv_path)
+            strip_column_names(df)
+            # Store Date typed so POST-range filters can be pushed down into the reader
             if 'Date' in df.columns:
                 df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-                df = df.dropna(subset=['Date'])
-                
-                # Apply POST date range filter first
-                if post_start_date and post_end_date:
-                    post_start = pd.to_datetime(post_start_date, format='%m/%d/%Y').date() if isinstance(post_start_date, str) else post_start_date
-                    post_end = pd.to_datetime(post_end_date, format='%m/%d/%Y').date() if isinstance(post_end_date, str) else post_end_date
-                    if hasattr(post_start, 'date'):
-                        post_start = post_start.date()
-                    if hasattr(post_end, 'date'):
-                        post_end = post_end.date()
-                    post_mask = (df['Date'].dt.date >= post_start) & (df['Date'].dt.date <= post_end)
-                    df = df[post_mask]
-                    
-                    # Then apply excluded dates filter to the post-period data
-                    if excluded_dates and not df.empty:
-                        df = filter_excluded_dates(df, 'Date', excluded_dates)
-                else:
-                    # If no post dates provided, return empty dataframe
-                    df = pd.DataFrame()
-            
-            all_data.append(df)
-        except Exception as e:
-            st.warning(f"Error loading {promotion_file.name}: {str(e)}")
-            continue
-    
-    if not all_data:
-        return pd.DataFrame()
-    
-    # Combine all dataframes
-    combined_df = pd.concat(all_data, ignore_index=True)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), PARQUET_SOURCE_VERSION_KEY: version})
+            fd, tmp_path = tempfile.mkstemp(dir=parquet_path.parent, prefix=f".{parquet_path.stem}-", suffix='.tmp')
+            os.close(fd)
+            try:
+                pq.write_table(table, tmp_path, compression='zstd')
+                os.replace(tmp_path, parquet_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        return parquet_path
+    except Exception:
+        # Mixed-type columns or a read-only folder - fall back to reading the CSV
+        return None
+
+
+def _read_marketing_file(marketing_file, file_type, post_start=None, post_end=None):
+    """
+    Read the columns needed for Corporate vs TODC from a marketing file.
     
-    # Required columns
-    required_cols = ['Is self serve campaign', 'Orders', 'Sales', 'Customer discounts from marketing | (Funded by you)']
-    missing_cols = [col for col in required_cols if col not in combined_df.columns]
-    if missing_cols:
-        st.warning(f"Missing columns in promotion files: {missing_cols}")
-        return pd.DataFrame()
+    Reads from the cached Parquet copy when available, pushing the POST date range
+    [post_start, post_end) down into the scan so out-of-range rows are never
+    materialized. Falls back to the full CSV otherwise.
+    """
+    needed_cols = ['Date', 'Is self serve campaign', 'Orders', 'Sales', MARKETING_SPEND_COLUMNS[file_type]]
     
-    # Convert to numeric
-    combined_df['Orders'] = pd.to_numeric(combined_df['Orders'], errors='coerce').fillna(0)
-    combined_df['Sales'] = pd.to_numeric(combined_df['Sales'], errors='coerce').fillna(0)
-    combined_df['Customer discounts from marketing | (Funded by you)'] = pd.to_numeric(
-        combined_df['Customer discounts from marketing | (Funded by you)'], errors='coerce'
-    ).fillna(0)
+    parquet_path = _cached_parquet(marketing_file)
+    if parquet_path is not None:
+        try:
+            dataset = ds.dataset(parquet_path, format='parquet')
+            schema = dataset.schema
+            date_filter = None
+            if post_start is not None and 'Date' in schema.names and pa.types.is_timestamp(schema.field('Date').type):
+                date_filter = (ds.field('Date') >= post_start.to_pydatetime()) & (ds.field('Date') < post_end.to_pydatetime())
+            
+            columns = [col for col in needed_cols if col in schema.names]
+            return dataset.to_table(columns=columns, filter=date_filter).to_pandas()
+        except Exception:
+            # Unreadable Parquet copy (e.g. replaced or damaged outside the app) - read the CSV instead
+            pass
+    
+    df = pd.read_csv(marketing_file)
+    strip_column_names(df)
+    return df
+
+
+def _load_marketing_file(marketing_dir, file_type, excluded_dates=None, post_start_date=None, post_end_date=None):
+    """
+    Load a single marketing CSV and filter it to the POST date range.
     
-    # Rename Spend column
-    combined_df['Spend'] = combined_df['Customer discounts from marketing | (Funded by you)']
+    Runs in a worker thread, so it must not call Streamlit directly; errors are
+    returned to the caller and reported from the main thread.
     
-    # Group by "Is self serve campaign" and aggregate
-    pivot_df = combined_df.groupby('Is self serve campaign').agg({
-        'Orders': 'sum',
-        'Sales': 'sum',
-        'Spend': 'sum'
-    }).reset_index()
+    Returns:
+        Tuple of (DataFrame or None, error message or None)
+    """
+    marketing_file = get_marketing_file_path(marketing_dir, file_type)
+    if not marketing_file or not marketing_file.exists():
+        return None, None
+    
+    try:
+        # POST window as [post_start, post_end) so the end date is fully inclusive
+        post_start = post_end = None
+        if post_start_date and post_end_date:
+            post_start = _as_ts(post_start_date)
+            post_end = _as_ts(post_end_date) + pd.Timedelta(days=1)
+        
+        df = _read_marketing_file(marketing_file, file_type, post_start, post_end)
+        
+        # Filter by date range if provided - ONLY use POST dates for Corporate vs TODC
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+            df = df.dropna(subset=['Date'])
+            
+            # Apply POST date range filter first (already applied by the reader for Parquet sources)
+            if post_start is not None:
+                post_mask = df['Date'].between(post_start, post_end, inclusive='left')
+                df = df[post_mask]
+                
+                # Then apply excluded dates filter to the post-period data
+                if excluded_dates is not None and not df.empty:
+                    df = filter_excluded_dates(df, 'Date', excluded_dates)
+            else:
+                # If no post dates provided, return empty dataframe
+                df = pd.DataFrame()
+        
+        return df, None
+    except Exception as e:
+        return None, f"Error loading {marketing_file.name}: {str(e)}"
+
+
+def _load_marketing_files(marketing_dirs, file_type, excluded_dates=None, post_start_date=None, post_end_date=None):
+    """
+    Load one marketing file per marketing_* directory in parallel.
     
-    # Calculate ROAS and Cost per Order
-    pivot_df['ROAS'] = pivot_df.apply(
-        lambda row: row['Sales'] / row['Spend'] if row['Spend'] != 0 else 0, axis=1
-    )
-    pivot_df['Cost per Order'] = pivot_df.apply(
-        lambda row: row['Spend'] / row['Orders'] if row['Orders'] != 0 else 0, axis=1
-    )
+    CSV parsing releases the GIL, so a small thread pool overlaps disk reads and
+    parsing across folders. Results keep the order of marketing_dirs.
     
-    # Set index to "Is self serve campaign"
-    pivot_df = pivot_df.set_index('Is self serve campaign')
+    Returns:
+        List of DataFrames (one per folder that had a matching file)
+    """
+    if not marketing_dirs:
+        return []
     
-    # Reorder columns
-    pivot_df = pivot_df[['Orders', 'Sales', 'Spend', 'ROAS', 'Cost per Order']]
+    with ThreadPoolExecutor(max_workers=min(8, len(marketing_dirs))) as executor:
+        futures = [
+            executor.submit(_load_marketing_file, marketing_dir, file_type, excluded_dates, post_start_date, post_end_date)
+            for marketing_dir in marketing_dirs
+        ]
+        results = [future.result() for future in futures]
     
-    return pivot_df
+    all_data = []
+    for df, error in results:
+        if error:
+            st.warning(error)
+        elif df is not None:
+            all_data.append(df)
+    return all_data
 
 
-def process_marketing_sponsored_files(excluded_dates=None, pre_start_date=None, pre_end_date=None, post_start_date=None, post_end_date=None, marketing_folder_path=None):
+def _process_marketing_files(file_type, excluded_dates=None, post_start_date=None, post_end_date=None,
+                             marketing_folder_path=None, marketing_dirs=None):
     """
-    Process all MARKETING_SPONSORED_LISTING files and create pivot table by "Is self serve campaign".
+    Process all marketing files of one type and create pivot table by "Is self serve campaign".
+    
+    Args:
+        file_type: 'PROMOTION' or 'SPONSORED_LISTING' (selects file pattern and spend column)
+        marketing_dirs: Optional list from find_marketing_folders, to skip the directory scan
     
     Returns:
         DataFrame with rows = "Is self serve campaign" values, columns = Orders, Sales, Spend, ROAS, Cost per Order
     """
-    marketing_dirs = find_marketing_folders(marketing_folder_path)
+    if marketing_dirs is None:
+        marketing_dirs = find_marketing_folders(marketing_folder_path)
+    excluded_dates = normalize_excluded_dates(excluded_dates)
     
-    all_data = []
-    
-    for marketing_dir in marketing_dirs:
-        sponsored_file = get_marketing_file_path(marketing_dir, 'SPONSORED_LISTING')
-        if not sponsored_file or not sponsored_file.exists():
-            continue
-        
-        try:
-            df = pd.read_csv(sponsored_file)
-            df.columns = df.columns.str.strip()
-            
-            # Filter by date range if provided - ONLY use POST dates for Corporate vs TODC
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-                df = df.dropna(subset=['Date'])
-                
-                # Apply POST date range filter first
-                if post_start_date and post_end_date:
-                    post_start = pd.to_datetime(post_start_date, format='%m/%d/%Y').date() if isinstance(post_start_date, str) else post_start_date
-                    post_end = pd.to_datetime(post_end_date, format='%m/%d/%Y').date() if isinstance(post_end_date, str) else post_end_date
-                    if hasattr(post_start, 'date'):
-                        post_start = post_start.date()
-                    if hasattr(post_end, 'date'):
-                        post_end = post_end.date()
-                    post_mask = (df['Date'].dt.date >= post_start) & (df['Date'].dt.date <= post_end)
-                    df = df[post_mask]
-                    
-                    # Then apply excluded dates filter to the post-period data
-                    if excluded_dates and not df.empty:
-                        df = filter_excluded_dates(df, 'Date', excluded_dates)
-                else:
-                    # If no post dates provided, return empty dataframe
-                    df = pd.DataFrame()
-            
-            all_data.append(df)
-        except Exception as e:
-            st.warning(f"Error loading {sponsored_file.name}: {str(e)}")
-            continue
+    all_data = _load_marketing_files(marketing_dirs, file_type, excluded_dates, post_start_date, post_end_date)
     
     if not all_data:
         return pd.DataFrame()
@@ -194,21 +255,20 @@ def process_marketing_sponsored_files(excluded_dates=None, pre_start_date=None,
     combined_df = pd.concat(all_data, ignore_index=True)
     
     # Required columns
-    required_cols = ['Is self serve campaign', 'Orders', 'Sales', 'Marketing fees | (including any applicable taxes)']
+    spend_col = MARKETING_SPEND_COLUMNS[file_type]
+    required_cols = ['Is self serve campaign', 'Orders', 'Sales', spend_col]
     missing_cols = [col for col in required_cols if col not in combined_df.columns]
     if missing_cols:
-        st.warning(f"Missing columns in sponsored listing files: {missing_cols}")
+        st.warning(f"Missing columns in {MARKETING_FILE_LABELS[file_type]} files: {missing_cols}")
         return pd.DataFrame()
     
     # Convert to numeric
     combined_df['Orders'] = pd.to_numeric(combined_df['Orders'], errors='coerce').fillna(0)
     combined_df['Sales'] = pd.to_numeric(combined_df['Sales'], errors='coerce').fillna(0)
-    combined_df['Marketing fees | (including any applicable taxes)'] = pd.to_numeric(
-        combined_df['Marketing fees | (including any applicable taxes)'], errors='coerce'
-    ).fillna(0)
+    combined_df[spend_col] = pd.to_numeric(combined_df[spend_col], errors='coerce').fillna(0)
     
     # Rename Spend column
-    combined_df['Spend'] = combined_df['Marketing fees | (including any applicable taxes)']
+    combined_df['Spend'] = combined_df[spend_col]
     
     # Group by "Is self serve campaign" and aggregate
     pivot_df = combined_df.groupby('Is self serve campaign').agg({
@@ -234,6 +294,28 @@ def process_marketing_sponsored_files(excluded_dates=None, pre_start_date=None,
     return pivot_df
 
 
+def process_marketing_promotion_files(excluded_dates=None, pre_start_date=None, pre_end_date=None, post_start_date=None, post_end_date=None, marketing_folder_path=None, marketing_dirs=None):
+    """
+    Process all MARKETING_PROMOTION files and create pivot table by "Is self serve campaign".
+    
+    Returns:
+        DataFrame with rows = "Is self serve campaign" values, columns = Orders, Sales, Spend, ROAS, Cost per Order
+    """
+    return _process_marketing_files('PROMOTION', excluded_dates, post_start_date, post_end_date,
+                                    marketing_folder_path, marketing_dirs)
+
+
+def process_marketing_sponsored_files(excluded_dates=None, pre_start_date=None, pre_end_date=None, post_start_date=None, post_end_date=None, marketing_folder_path=None, marketing_dirs=None):
+    """
+    Process all MARKETING_SPONSORED_LISTING files and create pivot table by "Is self serve campaign".
+    
+    Returns:
+        DataFrame with rows = "Is self serve campaign" values, columns = Orders, Sales, Spend, ROAS, Cost per Order
+    """
+    return _process_marketing_files('SPONSORED_LISTING', excluded_dates, post_start_date, post_end_date,
+                                    marketing_folder_path, marketing_dirs)
+
+
 def create_corporate_vs_todc_table(excluded_dates=None, pre_start_date=None, pre_end_date=None, post_start_date=None, post_end_date=None, marketing_folder_path=None):
     """
     Create Corporate vs TODC table combining promotion and sponsored listing data.
@@ -241,47 +323,37 @@ def create_corporate_vs_todc_table(excluded_dates=None, pre_start_date=None, pre
     Returns:
         Tuple of (promotion_table, sponsored_table, combined_table)
     """
+    # Only POST dates are used for Corporate vs TODC - without them both tables are empty
+    if not (post_start_date and post_end_date):
+        return pd.DataFrame(), pd.DataFrame(), None
+    
+    # Scan for marketing_* folders and normalize excluded dates once for both loaders
+    marketing_dirs = find_marketing_folders(marketing_folder_path)
+    excluded_dates = normalize_excluded_dates(excluded_dates)
+    
     # Process promotion files
     promotion_table = process_marketing_promotion_files(
-        excluded_dates, pre_start_date, pre_end_date, post_start_date, post_end_date, marketing_folder_path
+        excluded_dates, pre_start_date, pre_end_date, post_start_date, post_end_date, marketing_folder_path, marketing_dirs
     )
     
     # Process sponsored listing files
     sponsored_table = process_marketing_sponsored_files(
-        excluded_dates, pre_start_date, pre_end_date, post_start_date, post_end_date, marketing_folder_path
+        excluded_dates, pre_start_date, pre_end_date, post_start_date, post_end_date, marketing_folder_path, marketing_dirs
     )
     
     # Combine tables row-wise (sum values for same "Is self serve campaign" values)
     combined_table = None
     if not promotion_table.empty and not sponsored_table.empty:
         # Combine by adding values for same index (Is self serve campaign)
-        # Get all unique index values from both tables
-        all_indices = set(promotion_table.index) | set(sponsored_table.index)
-        
-        combined_data = []
-        for idx in all_indices:
-            promo_row = promotion_table.loc[idx] if idx in promotion_table.index else pd.Series({
-                'Orders': 0, 'Sales': 0, 'Spend': 0, 'ROAS': 0, 'Cost per Order': 0
-            })
-            sponsored_row = sponsored_table.loc[idx] if idx in sponsored_table.index else pd.Series({
-                'Orders': 0, 'Sales': 0, 'Spend': 0, 'ROAS': 0, 'Cost per Order': 0
-            })
-            
-            # Sum the values
-            combined_row = {
-                'Orders': promo_row['Orders'] + sponsored_row['Orders'],
-                'Sales': promo_row['Sales'] + sponsored_row['Sales'],
-                'Spend': promo_row['Spend'] + sponsored_row['Spend']
-            }
-            
-            # Recalculate ROAS and Cost per Order
-            combined_row['ROAS'] = combined_row['Sales'] / combined_row['Spend'] if combined_row['Spend'] != 0 else 0
-            combined_row['Cost per Order'] = combined_row['Spend'] / combined_row['Orders'] if combined_row['Orders'] != 0 else 0
-            
-            combined_data.append(combined_row)
+        sum_cols = ['Orders', 'Sales', 'Spend']
+        combined_table = promotion_table[sum_cols].add(sponsored_table[sum_cols], fill_value=0)
         
-        combined_table = pd.DataFrame(combined_data, index=list(all_indices))
-        combined_table = combined_table[['Orders', 'Sales', 'Spend', 'ROAS', 'Cost per Order']]
+        # Recalculate ROAS and Cost per Order
+        spend = combined_table['Spend'].to_numpy(dtype=float)
+        orders = combined_table['Orders'].to_numpy(dtype=float)
+        sales = combined_table['Sales'].to_numpy(dtype=float)
+        combined_table['ROAS'] = np.divide(sales, spend, out=np.zeros(len(combined_table)), where=spend != 0)
+        combined_table['Cost per Order'] = np.divide(spend, orders, out=np.zeros(len(combined_table)), where=orders != 0)
     elif not promotion_table.empty:
         combined_table = promotion_table.copy()
     elif not sponsored_table.empty:
@@ -15,6 +15,7 @@ Slack app: enable Socket Mode; subscribe to the `file_shared` event; scopes need
 
 from __future__ import annotations
 
+import functools
 import io
 import json
 import os
@@ -176,7 +177,30 @@ def _build_dummy_streamlit_module() -> Any:
             return lambda f: f
         return func
 
+    resource_caches = []
+
+    def cache_resource_decorator(func=None, max_entries=None, **_kwargs):  # type: ignore[no-untyped-def]
+        """
+        `@st.cache_resource` keeps a bounded in-process cache, so a report run reads each master file once.
+        """
+        def wrap(f):  # type: ignore[no-untyped-def]
+            cached = functools.lru_cache(maxsize=max_entries)(f)
+            resource_caches.append(cached)
+            return cached
+
+        if func is None:
+            return wrap
+        return wrap(func)
+
+    def clear_resource_caches() -> None:
+        """Mirror `st.cache_resource.clear()`."""
+        for cached in resource_caches:
+            cached.cache_clear()
+
+    cache_resource_decorator.clear = clear_resource_caches  # type: ignore[attr-defined]
+
     dummy.cache_data = cache_data_decorator
+    dummy.cache_resource = cache_resource_decorator
 
     @contextmanager
     def spinner(_text: str):  # type: ignore[no-untyped-def]
@@ -241,8 +265,9 @@ def generate_app2_report_excel(
         _STREAMLIT_DUMMY = _build_dummy_streamlit_module()
     dummy_streamlit = _STREAMLIT_DUMMY
 
-    # Reset state for each report run.
+    # Reset state for each report run; cached master frames belong to the previous run's files.
     dummy_streamlit.session_state = _SessionState()
+    dummy_streamlit.cache_resource.clear()
     sys.modules["streamlit"] = dummy_streamlit  # type: ignore[assignment]
 
     # Ensure App2.0 modules are importable by their plain module names.
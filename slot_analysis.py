@@ -1,8 +1,9 @@
 """Slot-based analysis functions for DoorDash and UberEats data"""
+import numpy as np
 import pandas as pd
 import streamlit as st
 from pathlib import Path
-from utils import filter_master_file_by_date_range, filter_excluded_dates
+from utils import filter_master_file_by_date_range, filter_excluded_dates, normalize_excluded_dates
 from data_processing import get_last_year_dates
 
 #hi
@@ -53,6 +54,32 @@ def get_time_slot(time_str):
         return None
 
 
+def _diff_growth(base, current):
+    """Element-wise difference and growth % of current over base (0 where base is 0)"""
+    diff = current - base
+    growth = np.divide(diff, base, out=np.zeros_like(diff), where=base != 0) * 100.0
+    return diff, growth
+
+
+def _build_slot_table(slot_order, base_map, current_map, base_label, diff_label):
+    """
+    Build one slot table from per-slot base and current values.
+    
+    Columns: Slot, <base_label>, Post, <diff_label>, Growth%
+    (e.g. Pre/Post/Pre vs Post for period tables, Last year post/Post/YoY for YoY tables)
+    """
+    base = np.array([base_map[slot] for slot in slot_order], dtype=float)
+    current = np.array([current_map[slot] for slot in slot_order], dtype=float)
+    diff, growth = _diff_growth(base, current)
+    return pd.DataFrame({
+        'Slot': slot_order,
+        base_label: base,
+        'Post': current,
+        diff_label: diff,
+        'Growth%': [f"{g:.1f}%" for g in growth]
+    })
+
+
 def process_slot_analysis(file_path, pre_start_date, pre_end_date, post_start_date, post_end_date, excluded_dates=None):
     """
     Process DoorDash financial file and create slot-based analysis tables.
@@ -69,6 +96,9 @@ def process_slot_analysis(file_path, pre_start_date, pre_end_date, post_start_da
         # Define slot order
         slot_order = ['Overnight', 'Breakfast', 'Lunch', 'Afternoon', 'Dinner', 'Late night']
         
+        # Normalize excluded dates once for all three period loads
+        excluded_dates = normalize_excluded_dates(excluded_dates)
+        
         # Load and process Pre period data
         date_col_variations = ['Timestamp local date', 'Timestamp Local Date', 'Timestamp Local date', 
                               'timestamp local date', 'Date', 'date', 'Timestamp', 'timestamp']
@@ -122,141 +152,58 @@ def process_slot_analysis(file_path, pre_start_date, pre_end_date, post_start_da
             return empty_table, empty_table.copy(), empty_table.copy(), empty_table.copy()
         
         # Process Pre period
-        pre_slot_sales = {}
-        pre_slot_payouts = {}
         if not pre_df.empty:
             pre_df = pre_df.copy()
-            pre_df['Slot'] = pre_df[time_col].apply(get_time_slot)
+            pre_df['Slot'] = pd.Categorical(pre_df[time_col].apply(get_time_slot), categories=slot_order, ordered=True)
             pre_df = pre_df.dropna(subset=['Slot'])
             pre_df[sales_col] = pd.to_numeric(pre_df[sales_col], errors='coerce')
             pre_df[payout_col] = pd.to_numeric(pre_df[payout_col], errors='coerce')
             
-            pre_slot_agg = pre_df.groupby('Slot').agg({
-                sales_col: 'sum',
-                payout_col: 'sum'
-            }).reset_index()
-            
-            for slot in slot_order:
-                slot_data = pre_slot_agg[pre_slot_agg['Slot'] == slot]
-                pre_slot_sales[slot] = slot_data[sales_col].sum() if len(slot_data) > 0 else 0.0
-                pre_slot_payouts[slot] = slot_data[payout_col].sum() if len(slot_data) > 0 else 0.0
+            # All six slots in slot order in one pass (empty slots sum to 0)
+            pre_slot_agg = pre_df.groupby('Slot', observed=False)[[sales_col, payout_col]].sum().reindex(slot_order, fill_value=0.0)
+            pre_slot_sales = pre_slot_agg[sales_col].to_dict()
+            pre_slot_payouts = pre_slot_agg[payout_col].to_dict()
         else:
             pre_slot_sales = {slot: 0.0 for slot in slot_order}
             pre_slot_payouts = {slot: 0.0 for slot in slot_order}
         
         # Process Post period
-        post_slot_sales = {}
-        post_slot_payouts = {}
         if not post_df.empty:
             post_df = post_df.copy()
-            post_df['Slot'] = post_df[time_col].apply(get_time_slot)
+            post_df['Slot'] = pd.Categorical(post_df[time_col].apply(get_time_slot), categories=slot_order, ordered=True)
             post_df = post_df.dropna(subset=['Slot'])
             post_df[sales_col] = pd.to_numeric(post_df[sales_col], errors='coerce')
             post_df[payout_col] = pd.to_numeric(post_df[payout_col], errors='coerce')
             
-            post_slot_agg = post_df.groupby('Slot').agg({
-                sales_col: 'sum',
-                payout_col: 'sum'
-            }).reset_index()
-            
-            for slot in slot_order:
-                slot_data = post_slot_agg[post_slot_agg['Slot'] == slot]
-                post_slot_sales[slot] = slot_data[sales_col].sum() if len(slot_data) > 0 else 0.0
-                post_slot_payouts[slot] = slot_data[payout_col].sum() if len(slot_data) > 0 else 0.0
+            # All six slots in slot order in one pass (empty slots sum to 0)
+            post_slot_agg = post_df.groupby('Slot', observed=False)[[sales_col, payout_col]].sum().reindex(slot_order, fill_value=0.0)
+            post_slot_sales = post_slot_agg[sales_col].to_dict()
+            post_slot_payouts = post_slot_agg[payout_col].to_dict()
         else:
             post_slot_sales = {slot: 0.0 for slot in slot_order}
             post_slot_payouts = {slot: 0.0 for slot in slot_order}
         
         # Process Last Year Post period (post_24)
-        post_24_slot_sales = {}
-        post_24_slot_payouts = {}
         if not post_24_df.empty:
             post_24_df = post_24_df.copy()
-            post_24_df['Slot'] = post_24_df[time_col].apply(get_time_slot)
+            post_24_df['Slot'] = pd.Categorical(post_24_df[time_col].apply(get_time_slot), categories=slot_order, ordered=True)
             post_24_df = post_24_df.dropna(subset=['Slot'])
             post_24_df[sales_col] = pd.to_numeric(post_24_df[sales_col], errors='coerce')
             post_24_df[payout_col] = pd.to_numeric(post_24_df[payout_col], errors='coerce')
             
-            post_24_slot_agg = post_24_df.groupby('Slot').agg({
-                sales_col: 'sum',
-                payout_col: 'sum'
-            }).reset_index()
-            
-            for slot in slot_order:
-                slot_data = post_24_slot_agg[post_24_slot_agg['Slot'] == slot]
-                post_24_slot_sales[slot] = slot_data[sales_col].sum() if len(slot_data) > 0 else 0.0
-                post_24_slot_payouts[slot] = slot_data[payout_col].sum() if len(slot_data) > 0 else 0.0
+            # All six slots in slot order in one pass (empty slots sum to 0)
+            post_24_slot_agg = post_24_df.groupby('Slot', observed=False)[[sales_col, payout_col]].sum().reindex(slot_order, fill_value=0.0)
+            post_24_slot_sales = post_24_slot_agg[sales_col].to_dict()
+            post_24_slot_payouts = post_24_slot_agg[payout_col].to_dict()
         else:
             post_24_slot_sales = {slot: 0.0 for slot in slot_order}
             post_24_slot_payouts = {slot: 0.0 for slot in slot_order}
         
-        # Create Table 1: Sales Pre/Post (Pre, Post, Pre vs Post, Growth%)
-        sales_pre_post_data = []
-        for slot in slot_order:
-            pre_val = pre_slot_sales[slot]
-            post_val = post_slot_sales[slot]
-            pre_vs_post = post_val - pre_val
-            growth_pct = f"{((post_val - pre_val) / pre_val * 100):.1f}%" if pre_val != 0 else "0.0%"
-            
-            sales_pre_post_data.append({
-                'Slot': slot,
-                'Pre': pre_val,
-                'Post': post_val,
-                'Pre vs Post': pre_vs_post,
-                'Growth%': growth_pct
-            })
-        sales_pre_post_table = pd.DataFrame(sales_pre_post_data)
-        
-        # Create Table 2: Sales YoY (Last year post, Post, YoY, Growth%)
-        sales_yoy_data = []
-        for slot in slot_order:
-            last_year_post = post_24_slot_sales[slot]
-            post_val = post_slot_sales[slot]
-            yoy = post_val - last_year_post
-            growth_pct = f"{((post_val - last_year_post) / last_year_post * 100):.1f}%" if last_year_post != 0 else "0.0%"
-            
-            sales_yoy_data.append({
-                'Slot': slot,
-                'Last year post': last_year_post,
-                'Post': post_val,
-                'YoY': yoy,
-                'Growth%': growth_pct
-            })
-        sales_yoy_table = pd.DataFrame(sales_yoy_data)
-        
-        # Create Table 3: Payouts Pre/Post (Pre, Post, Pre vs Post, Growth%)
-        payouts_pre_post_data = []
-        for slot in slot_order:
-            pre_val = pre_slot_payouts[slot]
-            post_val = post_slot_payouts[slot]
-            pre_vs_post = post_val - pre_val
-            growth_pct = f"{((post_val - pre_val) / pre_val * 100):.1f}%" if pre_val != 0 else "0.0%"
-            
-            payouts_pre_post_data.append({
-                'Slot': slot,
-                'Pre': pre_val,
-                'Post': post_val,
-                'Pre vs Post': pre_vs_post,
-                'Growth%': growth_pct
-            })
-        payouts_pre_post_table = pd.DataFrame(payouts_pre_post_data)
-        
-        # Create Table 4: Payouts YoY (Last year post, Post, YoY, Growth%)
-        payouts_yoy_data = []
-        for slot in slot_order:
-            last_year_post = post_24_slot_payouts[slot]
-            post_val = post_slot_payouts[slot]
-            yoy = post_val - last_year_post
-            growth_pct = f"{((post_val - last_year_post) / last_year_post * 100):.1f}%" if last_year_post != 0 else "0.0%"
-            
-            payouts_yoy_data.append({
-                'Slot': slot,
-                'Last year post': last_year_post,
-                'Post': post_val,
-                'YoY': yoy,
-                'Growth%': growth_pct
-            })
-        payouts_yoy_table = pd.DataFrame(payouts_yoy_data)
+        # Table 1: Sales Pre/Post, Table 2: Sales YoY, Table 3: Payouts Pre/Post, Table 4: Payouts YoY
+        sales_pre_post_table = _build_slot_table(slot_order, pre_slot_sales, post_slot_sales, 'Pre', 'Pre vs Post')
+        sales_yoy_table = _build_slot_table(slot_order, post_24_slot_sales, post_slot_sales, 'Last year post', 'YoY')
+        payouts_pre_post_table = _build_slot_table(slot_order, pre_slot_payouts, post_slot_payouts, 'Pre', 'Pre vs Post')
+        payouts_yoy_table = _build_slot_table(slot_order, post_24_slot_payouts, post_slot_payouts, 'Last year post', 'YoY')
         
         return sales_pre_post_table, sales_yoy_table, payouts_pre_post_table, payouts_yoy_table
         
@@ -323,6 +270,7 @@ def process_ue_slot_analysis(file_path, pre_start_date, pre_end_date,
         })
 
     try:
+        excluded_dates = normalize_excluded_dates(excluded_dates)
         pre_df = _load_ue_period(file_path, pre_start_date, pre_end_date, excluded_dates)
         post_df = _load_ue_period(file_path, post_start_date, post_end_date, excluded_dates)
         p24_s_dt, p24_e_dt = get_last_year_dates(post_start_date, post_end_date)
@@ -355,41 +303,28 @@ def process_ue_slot_analysis(file_path, pre_start_date, pre_end_date,
             if df.empty or time_col not in df.columns:
                 return s_map, p_map
             df = df.copy()
-            df['Slot'] = df[time_col].apply(_get_ue_time_slot)
+            df['Slot'] = pd.Categorical(df[time_col].apply(_get_ue_time_slot), categories=slot_order, ordered=True)
             df = df.dropna(subset=['Slot'])
-            if sales_col in df.columns:
-                df[sales_col] = pd.to_numeric(df[sales_col], errors='coerce')
-            if payout_col in df.columns:
-                df[payout_col] = pd.to_numeric(df[payout_col], errors='coerce')
-            for slot in slot_order:
-                chunk = df[df['Slot'] == slot]
-                s_map[slot] = chunk[sales_col].sum() if sales_col in df.columns else 0.0
-                p_map[slot] = chunk[payout_col].sum() if payout_col in df.columns else 0.0
+            value_cols = [c for c in (sales_col, payout_col) if c in df.columns]
+            for c in value_cols:
+                df[c] = pd.to_numeric(df[c], errors='coerce')
+            if not value_cols:
+                return s_map, p_map
+            slot_agg = df.groupby('Slot', observed=False)[value_cols].sum().reindex(slot_order, fill_value=0.0)
+            if sales_col in slot_agg.columns:
+                s_map = slot_agg[sales_col].to_dict()
+            if payout_col in slot_agg.columns:
+                p_map = slot_agg[payout_col].to_dict()
             return s_map, p_map
 
         pre_s, pre_p = _agg(pre_df)
         post_s, post_p = _agg(post_df)
         p24_s, p24_p = _agg(post_24_df)
 
-        def _tbl(pre_m, post_m):
-            rows = []
-            for slot in slot_order:
-                pv, tv = pre_m[slot], post_m[slot]
-                d = tv - pv
-                g = "{:.1f}%".format((d / pv * 100) if pv else 0)
-                rows.append({'Slot': slot, 'Pre': pv, 'Post': tv, 'Pre vs Post': d, 'Growth%': g})
-            return pd.DataFrame(rows)
-
-        def _yoy(ly_m, post_m):
-            rows = []
-            for slot in slot_order:
-                ly, tv = ly_m[slot], post_m[slot]
-                d = tv - ly
-                g = "{:.1f}%".format((d / ly * 100) if ly else 0)
-                rows.append({'Slot': slot, 'Last year post': ly, 'Post': tv, 'YoY': d, 'Growth%': g})
-            return pd.DataFrame(rows)
-
-        return _tbl(pre_s, post_s), _yoy(p24_s, post_s), _tbl(pre_p, post_p), _yoy(p24_p, post_p)
+        return (_build_slot_table(slot_order, pre_s, post_s, 'Pre', 'Pre vs Post'),
+                _build_slot_table(slot_order, p24_s, post_s, 'Last year post', 'YoY'),
+                _build_slot_table(slot_order, pre_p, post_p, 'Pre', 'Pre vs Post'),
+                _build_slot_table(slot_order, p24_p, post_p, 'Last year post', 'YoY'))
 
     except Exception as e:
         st.error("Error in UberEats slot analysis: {}".format(e))
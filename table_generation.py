@@ -1,502 +1,269 @@
 """Table generation functions for creating summary and store-level tables"""
+import numpy as np
 import pandas as pd
 import streamlit as st
+from config import USE_POLARS
+from utils import drop_empty_rows, filter_stores, sorted_store_ids
 
+try:
+    import polars as pl
+except ImportError:  # polars is optional; the store tables are combined with pandas without it
+    pl = None
 
-def create_summary_tables(sales_df, payouts_df, orders_df, new_customers_df, selected_stores, is_ue=False):
-    """Create summary tables aggregated across all selected stores"""
-    # Filter by selected stores
-    sales_filtered = sales_df[sales_df['Store ID'].isin(selected_stores)]
-    payouts_filtered = payouts_df[payouts_df['Store ID'].isin(selected_stores)]
-    orders_filtered = orders_df[orders_df['Store ID'].isin(selected_stores)]
-    
-    # For UE, get platform-level new customers totals from session state
-    if is_ue and 'ue_new_customers_totals' in st.session_state:
-        ue_totals = st.session_state['ue_new_customers_totals']
-        # Use platform totals directly (not store-level)
-        new_customers_summary = {
-            'pre_25': ue_totals.get('pre_25', 0),
-            'post_25': ue_totals.get('post_25', 0),
-            'PrevsPost': ue_totals.get('post_25', 0) - ue_totals.get('pre_25', 0),
-            'LastYear_Pre_vs_Post': ue_totals.get('post_24', 0) - ue_totals.get('pre_24', 0),
-            'post_24': ue_totals.get('post_24', 0),
-            'YoY': ue_totals.get('post_25', 0) - ue_totals.get('post_24', 0),
-        }
-        new_customers_summary['Growth%'] = (new_customers_summary['PrevsPost'] / new_customers_summary['pre_25'] * 100) if new_customers_summary['pre_25'] != 0 else 0
-        new_customers_summary['YoY%'] = (new_customers_summary['YoY'] / new_customers_summary['post_24'] * 100) if new_customers_summary['post_24'] != 0 else 0
-    else:
+# Columns summed across stores for every metric; the first four are the raw period totals
+PERIOD_COLS = ['pre_24', 'pre_25', 'post_24', 'post_25']
+SUM_COLS = PERIOD_COLS + ['PrevsPost', 'LastYear_Pre_vs_Post', 'YoY']
+# Summary arrays hold the SUM_COLS totals followed by Growth% and YoY%
+SUMMARY_COLS = SUM_COLS + ['Growth%', 'YoY%']
+# float32 keeps only ~7 significant digits, too few for sales totals shown to 0.1
+SUMMARY_DTYPE = np.float64
+(I_PRE_24, I_PRE_25, I_POST_24, I_POST_25, I_PREVS_POST,
+ I_LY_PREVS_POST, I_YOY, I_GROWTH, I_YOY_PCT) = range(len(SUMMARY_COLS))
+
+# Table rows: metrics summed from the data, then the ratios derived from them
+SUMMARY_METRICS = ['Sales', 'Payouts', 'Orders', 'New Customers']
+DERIVED_METRICS = ['Profitability', 'Average Check']
+
+# Profitability is a percentage, Average Check a plain ratio
+RATIO_SCALE = np.array([[100.0], [1.0]])
+
+# Summary array positions shown in each table, and their display names
+TABLE1_POSITIONS = [I_PRE_25, I_POST_25, I_PREVS_POST, I_LY_PREVS_POST, I_GROWTH]
+TABLE1_COLUMNS = ['Pre', 'Post', 'PrevsPost', 'LastYear Pre vs Post', 'Growth%']
+TABLE2_POSITIONS = [I_POST_24, I_POST_25, I_YOY, I_YOY_PCT]
+TABLE2_COLUMNS = ['last year-post', 'post', 'YoY', 'YoY%']
+
+
+@st.cache_data
+def _store_totals(df):
+    """SUM_COLS totals per Store ID (missing columns count as 0), computed once per frame"""
+    return df.reindex(columns=SUM_COLS, fill_value=0).groupby(df['Store ID'], sort=False, observed=True).sum()
+
+
+def _selected_totals(df, stores):
+    """SUM_COLS totals over the rows of df that belong to the given set of stores"""
+    if df.empty:
+        return np.zeros(len(SUM_COLS), dtype=SUMMARY_DTYPE)
+    totals = _store_totals(df)
+    # Usual case: every store is selected, so no per-store lookup is needed
+    if not stores.issuperset(totals.index):
+        totals = totals[totals.index.isin(stores)]
+    return totals.sum(axis=0).to_numpy(dtype=SUMMARY_DTYPE)
+
+
+def _add_growth(sums):
+    """Append Growth% (PrevsPost vs pre_25) and YoY% (YoY vs post_24) to SUM_COLS totals (one row or a stack)"""
+    sums = np.asarray(sums, dtype=SUMMARY_DTYPE)
+    summary = np.empty(sums.shape[:-1] + (len(SUMMARY_COLS),), dtype=SUMMARY_DTYPE)
+    summary[..., :I_GROWTH] = sums
+    den = summary[..., [I_PRE_25, I_POST_24]]
+    summary[..., I_GROWTH:] = np.divide(summary[..., [I_PREVS_POST, I_YOY]], den, out=np.zeros_like(den), where=den != 0) * 100
+    return summary
+
+
+def _round_summary(summary):
+    """Round a summary array (or a stack of them) to 1 decimal place in place"""
+    return summary.round(1, out=summary)
+
+
+def _period_summary(periods):
+    """Summary from PERIOD_COLS values (one row or a stack): the changes between them plus Growth%/YoY%"""
+    periods = np.asarray(periods, dtype=SUMMARY_DTYPE)
+    last_year_pre, pre, last_year_post, post = (periods[..., i] for i in range(len(PERIOD_COLS)))
+    changes = np.stack([post - pre, last_year_post - last_year_pre, post - last_year_post], axis=-1)
+    return _add_growth(np.concatenate([periods, changes], axis=-1))
+
+
+def _derived_summaries(sales, payouts, orders):
+    """Profitability (Payouts/Sales%) and Average Check (Sales/Orders) summaries as one (2, 9) array"""
+    periods = slice(I_PRE_24, I_POST_25 + 1)
+    num = np.vstack([payouts[periods], sales[periods]])
+    den = np.vstack([sales[periods], orders[periods]])
+    ratios = np.divide(num, den, out=np.zeros_like(num), where=den != 0) * RATIO_SCALE
+    return _period_summary(ratios)
+
+
+def _totals_array(totals):
+    """PERIOD_COLS values of a platform totals dict such as the UE new customers, 0 where missing"""
+    return np.array([totals.get(c, 0) for c in PERIOD_COLS], dtype=SUMMARY_DTYPE)
+
+
+def _summary_tables(summaries, metrics):
+    """Build the Pre vs Post and YoY tables from one summary array per metric"""
+    summary = np.vstack(summaries)
+    index = pd.Index(metrics, name='Metric')
+    table1_df = pd.DataFrame(summary[:, TABLE1_POSITIONS], index=index, columns=TABLE1_COLUMNS)
+    table2_df = pd.DataFrame(summary[:, TABLE2_POSITIONS], index=index, columns=TABLE2_COLUMNS)
+    return table1_df, table2_df
+
+
+def _summarize(sales_df, payouts_df, orders_df, new_customers_df, selected_stores, ue_new_customers_totals=None):
+    """
+    Raw totals for one platform.
+    
+    Returns:
+        (4, len(SUM_COLS)) array with the Sales, Payouts, Orders and New Customers totals
+    """
+    totals = np.zeros((len(SUMMARY_METRICS), len(SUM_COLS)), dtype=SUMMARY_DTYPE)
+    for row, df in enumerate((sales_df, payouts_df, orders_df)):
+        totals[row] = _selected_totals(df, selected_stores)
+    
+    if ue_new_customers_totals is not None:
+        # Use UE platform totals directly (not store-level)
+        new_customers = _totals_array(ue_new_customers_totals)
+    elif not new_customers_df.empty and set(PERIOD_COLS).issubset(new_customers_df.columns):
         # For DD: mkt files use different Store IDs than main files, so sum ALL new customers
         # Don't filter by selected stores - aggregate all from mkt files
-        if not new_customers_df.empty and all(col in new_customers_df.columns for col in ['pre_24', 'post_24', 'pre_25', 'post_25', 'PrevsPost', 'LastYear_Pre_vs_Post', 'YoY']):
-            new_customers_summary = {
-                'pre_25': new_customers_df['pre_25'].sum(),
-                'post_25': new_customers_df['post_25'].sum(),
-                'PrevsPost': new_customers_df['PrevsPost'].sum(),
-                'LastYear_Pre_vs_Post': new_customers_df['LastYear_Pre_vs_Post'].sum(),
-                'post_24': new_customers_df['post_24'].sum(),
-                'YoY': new_customers_df['YoY'].sum(),
-            }
-            new_customers_summary['Growth%'] = (new_customers_summary['PrevsPost'] / new_customers_summary['pre_25'] * 100) if new_customers_summary['pre_25'] != 0 else 0
-            new_customers_summary['YoY%'] = (new_customers_summary['YoY'] / new_customers_summary['post_24'] * 100) if new_customers_summary['post_24'] != 0 else 0
-        else:
-            new_customers_summary = {
-                'pre_25': 0, 'post_25': 0, 'PrevsPost': 0, 'LastYear_Pre_vs_Post': 0,
-                'post_24': 0, 'YoY': 0, 'Growth%': 0, 'YoY%': 0
-            }
-    
-    # Aggregate across all stores
-    sales_summary = {
-        'pre_24': sales_filtered['pre_24'].sum() if not sales_filtered.empty and 'pre_24' in sales_filtered.columns else 0,
-        'pre_25': sales_filtered['pre_25'].sum() if not sales_filtered.empty and 'pre_25' in sales_filtered.columns else 0,
-        'post_24': sales_filtered['post_24'].sum() if not sales_filtered.empty and 'post_24' in sales_filtered.columns else 0,
-        'post_25': sales_filtered['post_25'].sum() if not sales_filtered.empty and 'post_25' in sales_filtered.columns else 0,
-        'PrevsPost': sales_filtered['PrevsPost'].sum() if not sales_filtered.empty and 'PrevsPost' in sales_filtered.columns else 0,
-        'LastYear_Pre_vs_Post': sales_filtered['LastYear_Pre_vs_Post'].sum() if not sales_filtered.empty and 'LastYear_Pre_vs_Post' in sales_filtered.columns else 0,
-        'YoY': sales_filtered['YoY'].sum() if not sales_filtered.empty and 'YoY' in sales_filtered.columns else 0,
-    }
-    # Calculate Growth% and YoY% from aggregated values
-    sales_summary['Growth%'] = (sales_summary['PrevsPost'] / sales_summary['pre_25'] * 100) if sales_summary['pre_25'] != 0 else 0
-    sales_summary['YoY%'] = (sales_summary['YoY'] / sales_summary['post_24'] * 100) if sales_summary['post_24'] != 0 else 0
-    
-    payouts_summary = {
-        'pre_24': payouts_filtered['pre_24'].sum() if not payouts_filtered.empty and 'pre_24' in payouts_filtered.columns else 0,
-        'pre_25': payouts_filtered['pre_25'].sum() if not payouts_filtered.empty and 'pre_25' in payouts_filtered.columns else 0,
-        'post_24': payouts_filtered['post_24'].sum() if not payouts_filtered.empty and 'post_24' in payouts_filtered.columns else 0,
-        'post_25': payouts_filtered['post_25'].sum() if not payouts_filtered.empty and 'post_25' in payouts_filtered.columns else 0,
-        'PrevsPost': payouts_filtered['PrevsPost'].sum() if not payouts_filtered.empty and 'PrevsPost' in payouts_filtered.columns else 0,
-        'LastYear_Pre_vs_Post': payouts_filtered['LastYear_Pre_vs_Post'].sum() if not payouts_filtered.empty and 'LastYear_Pre_vs_Post' in payouts_filtered.columns else 0,
-        'YoY': payouts_filtered['YoY'].sum() if not payouts_filtered.empty and 'YoY' in payouts_filtered.columns else 0,
-    }
-    # Calculate Growth% and YoY% from aggregated values
-    payouts_summary['Growth%'] = (payouts_summary['PrevsPost'] / payouts_summary['pre_25'] * 100) if payouts_summary['pre_25'] != 0 else 0
-    payouts_summary['YoY%'] = (payouts_summary['YoY'] / payouts_summary['post_24'] * 100) if payouts_summary['post_24'] != 0 else 0
-    
-    orders_summary = {
-        'pre_24': orders_filtered['pre_24'].sum() if not orders_filtered.empty and 'pre_24' in orders_filtered.columns else 0,
-        'pre_25': orders_filtered['pre_25'].sum() if not orders_filtered.empty and 'pre_25' in orders_filtered.columns else 0,
-        'post_24': orders_filtered['post_24'].sum() if not orders_filtered.empty and 'post_24' in orders_filtered.columns else 0,
-        'post_25': orders_filtered['post_25'].sum() if not orders_filtered.empty and 'post_25' in orders_filtered.columns else 0,
-        'PrevsPost': orders_filtered['PrevsPost'].sum() if not orders_filtered.empty and 'PrevsPost' in orders_filtered.columns else 0,
-        'LastYear_Pre_vs_Post': orders_filtered['LastYear_Pre_vs_Post'].sum() if not orders_filtered.empty and 'LastYear_Pre_vs_Post' in orders_filtered.columns else 0,
-        'YoY': orders_filtered['YoY'].sum() if not orders_filtered.empty and 'YoY' in orders_filtered.columns else 0,
-    }
-    # Calculate Growth% and YoY% from aggregated values
-    orders_summary['Growth%'] = (orders_summary['PrevsPost'] / orders_summary['pre_25'] * 100) if orders_summary['pre_25'] != 0 else 0
-    orders_summary['YoY%'] = (orders_summary['YoY'] / orders_summary['post_24'] * 100) if orders_summary['post_24'] != 0 else 0
-    
-    # Round to 1 decimal place
-    for key in sales_summary:
-        if isinstance(sales_summary[key], (int, float)):
-            sales_summary[key] = round(sales_summary[key], 1)
-    for key in payouts_summary:
-        if isinstance(payouts_summary[key], (int, float)):
-            payouts_summary[key] = round(payouts_summary[key], 1)
-    for key in orders_summary:
-        if isinstance(orders_summary[key], (int, float)):
-            orders_summary[key] = round(orders_summary[key], 1)
-    for key in new_customers_summary:
-        if isinstance(new_customers_summary[key], (int, float)):
-            new_customers_summary[key] = round(new_customers_summary[key], 1)
-    
-    # Calculate Profitability (Payouts/Sales%) and Average Check (Sales/Orders)
-    # Profitability: Pre
-    profitability_pre = (payouts_summary.get('pre_25', 0) / sales_summary.get('pre_25', 1) * 100) if sales_summary.get('pre_25', 0) != 0 else 0
-    # Profitability: Post
-    profitability_post = (payouts_summary.get('post_25', 0) / sales_summary.get('post_25', 1) * 100) if sales_summary.get('post_25', 0) != 0 else 0
-    # Profitability: PrevsPost
-    profitability_prevs_post = profitability_post - profitability_pre
-    # Profitability: LastYear Pre vs Post
-    profitability_last_year_pre = (payouts_summary.get('pre_24', 0) / sales_summary.get('pre_24', 1) * 100) if sales_summary.get('pre_24', 0) != 0 else 0
-    profitability_last_year_post = (payouts_summary.get('post_24', 0) / sales_summary.get('post_24', 1) * 100) if sales_summary.get('post_24', 0) != 0 else 0
-    profitability_last_year_prevs_post = profitability_last_year_post - profitability_last_year_pre
-    # Profitability: Growth%
-    profitability_growth = (profitability_prevs_post / profitability_pre * 100) if profitability_pre != 0 else 0
-    # Profitability: YoY
-    profitability_yoy = profitability_post - profitability_last_year_post
-    # Profitability: YoY%
-    profitability_yoy_pct = (profitability_yoy / profitability_last_year_post * 100) if profitability_last_year_post != 0 else 0
-    
-    profitability_summary = {
-        'pre_25': round(profitability_pre, 1),
-        'post_25': round(profitability_post, 1),
-        'PrevsPost': round(profitability_prevs_post, 1),
-        'LastYear_Pre_vs_Post': round(profitability_last_year_prevs_post, 1),
-        'post_24': round(profitability_last_year_post, 1),
-        'YoY': round(profitability_yoy, 1),
-        'Growth%': round(profitability_growth, 1),
-        'YoY%': round(profitability_yoy_pct, 1)
-    }
-    
-    # Average Check: Pre
-    aov_pre = (sales_summary.get('pre_25', 0) / orders_summary.get('pre_25', 1)) if orders_summary.get('pre_25', 0) != 0 else 0
-    # Average Check: Post
-    aov_post = (sales_summary.get('post_25', 0) / orders_summary.get('post_25', 1)) if orders_summary.get('post_25', 0) != 0 else 0
-    # Average Check: PrevsPost
-    aov_prevs_post = aov_post - aov_pre
-    # Average Check: LastYear Pre vs Post
-    aov_last_year_pre = (sales_summary.get('pre_24', 0) / orders_summary.get('pre_24', 1)) if orders_summary.get('pre_24', 0) != 0 else 0
-    aov_last_year_post = (sales_summary.get('post_24', 0) / orders_summary.get('post_24', 1)) if orders_summary.get('post_24', 0) != 0 else 0
-    aov_last_year_prevs_post = aov_last_year_post - aov_last_year_pre
-    # Average Check: Growth%
-    aov_growth = (aov_prevs_post / aov_pre * 100) if aov_pre != 0 else 0
-    # Average Check: YoY
-    aov_yoy = aov_post - aov_last_year_post
-    # Average Check: YoY%
-    aov_yoy_pct = (aov_yoy / aov_last_year_post * 100) if aov_last_year_post != 0 else 0
-    
-    aov_summary = {
-        'pre_25': round(aov_pre, 1),
-        'post_25': round(aov_post, 1),
-        'PrevsPost': round(aov_prevs_post, 1),
-        'LastYear_Pre_vs_Post': round(aov_last_year_prevs_post, 1),
-        'post_24': round(aov_last_year_post, 1),
-        'YoY': round(aov_yoy, 1),
-        'Growth%': round(aov_growth, 1),
-        'YoY%': round(aov_yoy_pct, 1)
-    }
-    
-    # Create Table 1: Pre vs Post
-    # For UE, exclude 'New Customers' from the metrics
-    if is_ue:
-        metrics = ['Sales', 'Payouts', 'Orders', 'Profitability', 'Average Check']
-        table1_data = {
-            'Metric': metrics,
-            'Pre': [sales_summary['pre_25'], payouts_summary['pre_25'], orders_summary['pre_25'], profitability_summary['pre_25'], aov_summary['pre_25']],
-            'Post': [sales_summary['post_25'], payouts_summary['post_25'], orders_summary['post_25'], profitability_summary['post_25'], aov_summary['post_25']],
-            'PrevsPost': [sales_summary['PrevsPost'], payouts_summary['PrevsPost'], orders_summary['PrevsPost'], profitability_summary['PrevsPost'], aov_summary['PrevsPost']],
-            'LastYear Pre vs Post': [sales_summary['LastYear_Pre_vs_Post'], payouts_summary['LastYear_Pre_vs_Post'], orders_summary['LastYear_Pre_vs_Post'], profitability_summary['LastYear_Pre_vs_Post'], aov_summary['LastYear_Pre_vs_Post']],
-            'Growth%': [sales_summary['Growth%'], payouts_summary['Growth%'], orders_summary['Growth%'], profitability_summary['Growth%'], aov_summary['Growth%']]
-        }
+        new_customers = new_customers_df[PERIOD_COLS].sum().to_numpy(dtype=SUMMARY_DTYPE)
     else:
-        metrics = ['Sales', 'Payouts', 'Orders', 'New Customers', 'Profitability', 'Average Check']
-        table1_data = {
-            'Metric': metrics,
-            'Pre': [sales_summary['pre_25'], payouts_summary['pre_25'], orders_summary['pre_25'], new_customers_summary['pre_25'], profitability_summary['pre_25'], aov_summary['pre_25']],
-            'Post': [sales_summary['post_25'], payouts_summary['post_25'], orders_summary['post_25'], new_customers_summary['post_25'], profitability_summary['post_25'], aov_summary['post_25']],
-            'PrevsPost': [sales_summary['PrevsPost'], payouts_summary['PrevsPost'], orders_summary['PrevsPost'], new_customers_summary['PrevsPost'], profitability_summary['PrevsPost'], aov_summary['PrevsPost']],
-            'LastYear Pre vs Post': [sales_summary['LastYear_Pre_vs_Post'], payouts_summary['LastYear_Pre_vs_Post'], orders_summary['LastYear_Pre_vs_Post'], new_customers_summary['LastYear_Pre_vs_Post'], profitability_summary['LastYear_Pre_vs_Post'], aov_summary['LastYear_Pre_vs_Post']],
-            'Growth%': [sales_summary['Growth%'], payouts_summary['Growth%'], orders_summary['Growth%'], new_customers_summary['Growth%'], profitability_summary['Growth%'], aov_summary['Growth%']]
-        }
-    table1_df = pd.DataFrame(table1_data)
-    table1_df = table1_df.set_index('Metric')
-    
-    # Create Table 2: YoY
+        new_customers = np.zeros(len(PERIOD_COLS), dtype=SUMMARY_DTYPE)
+    totals[-1] = _period_summary(new_customers)[:len(SUM_COLS)]
+    return totals
+
+
+def _to_tables(totals, include_new_customers=True):
+    """Round the _summarize totals, derive Profitability and Average Check, and build both tables"""
+    sales, payouts, orders, new_customers = _round_summary(_add_growth(totals))
+    profitability, aov = _round_summary(_derived_summaries(sales, payouts, orders))
+    if include_new_customers:
+        return _summary_tables([sales, payouts, orders, new_customers, profitability, aov], SUMMARY_METRICS + DERIVED_METRICS)
+    return _summary_tables([sales, payouts, orders, profitability, aov], SUMMARY_METRICS[:-1] + DERIVED_METRICS)
+
+
+def create_summary_tables(sales_df, payouts_df, orders_df, new_customers_df, selected_stores, is_ue=False):
+    """Create summary tables aggregated across all selected stores"""
+    # For UE, new customers come from platform-level totals in session state
+    ue_new_customers_totals = st.session_state.get('ue_new_customers_totals') if is_ue else None
+    return _cached_summary_tables(sales_df, payouts_df, orders_df, new_customers_df,
+                                  tuple(sorted(set(selected_stores))), is_ue, ue_new_customers_totals)
+
+
+@st.cache_data
+def _cached_summary_tables(sales_df, payouts_df, orders_df, new_customers_df, selected_stores, is_ue,
+                           ue_new_customers_totals):
+    """Cached body of create_summary_tables, keyed on the frames, the store tuple and the UE totals"""
+    totals = _summarize(sales_df, payouts_df, orders_df, new_customers_df, set(selected_stores), ue_new_customers_totals)
     # For UE, exclude 'New Customers' from the metrics
-    if is_ue:
-        metrics = ['Sales', 'Payouts', 'Orders', 'Profitability', 'Average Check']
-        table2_data = {
-            'Metric': metrics,
-            'last year-post': [sales_summary['post_24'], payouts_summary['post_24'], orders_summary['post_24'], profitability_summary['post_24'], aov_summary['post_24']],
-            'post': [sales_summary['post_25'], payouts_summary['post_25'], orders_summary['post_25'], profitability_summary['post_25'], aov_summary['post_25']],
-            'YoY': [sales_summary['YoY'], payouts_summary['YoY'], orders_summary['YoY'], profitability_summary['YoY'], aov_summary['YoY']],
-            'YoY%': [sales_summary['YoY%'], payouts_summary['YoY%'], orders_summary['YoY%'], profitability_summary['YoY%'], aov_summary['YoY%']]
-        }
-    else:
-        metrics = ['Sales', 'Payouts', 'Orders', 'New Customers', 'Profitability', 'Average Check']
-        table2_data = {
-            'Metric': metrics,
-            'last year-post': [sales_summary['post_24'], payouts_summary['post_24'], orders_summary['post_24'], new_customers_summary['post_24'], profitability_summary['post_24'], aov_summary['post_24']],
-            'post': [sales_summary['post_25'], payouts_summary['post_25'], orders_summary['post_25'], new_customers_summary['post_25'], profitability_summary['post_25'], aov_summary['post_25']],
-            'YoY': [sales_summary['YoY'], payouts_summary['YoY'], orders_summary['YoY'], new_customers_summary['YoY'], profitability_summary['YoY'], aov_summary['YoY']],
-            'YoY%': [sales_summary['YoY%'], payouts_summary['YoY%'], orders_summary['YoY%'], new_customers_summary['YoY%'], profitability_summary['YoY%'], aov_summary['YoY%']]
-        }
-    table2_df = pd.DataFrame(table2_data)
-    table2_df = table2_df.set_index('Metric')
-    
-    return table1_df, table2_df
+    return _to_tables(totals, include_new_customers=not is_ue)
 
 
 def create_combined_summary_tables(dd_sales_df, dd_payouts_df, dd_orders_df, dd_new_customers_df,
                                     ue_sales_df, ue_payouts_df, ue_orders_df, ue_new_customers_df,
                                     dd_selected_stores, ue_selected_stores):
     """Create combined summary tables for DD + UE"""
-    # Get DD summary
-    dd_sales_filtered = dd_sales_df[dd_sales_df['Store ID'].isin(dd_selected_stores)] if not dd_sales_df.empty else pd.DataFrame()
-    dd_payouts_filtered = dd_payouts_df[dd_payouts_df['Store ID'].isin(dd_selected_stores)] if not dd_payouts_df.empty else pd.DataFrame()
-    dd_orders_filtered = dd_orders_df[dd_orders_df['Store ID'].isin(dd_selected_stores)] if not dd_orders_df.empty else pd.DataFrame()
-    dd_new_customers_filtered = dd_new_customers_df[dd_new_customers_df['Store ID'].isin(dd_selected_stores)] if not dd_new_customers_df.empty else pd.DataFrame()
-    
-    # Get UE summary
-    ue_sales_filtered = ue_sales_df[ue_sales_df['Store ID'].isin(ue_selected_stores)] if not ue_sales_df.empty else pd.DataFrame()
-    ue_payouts_filtered = ue_payouts_df[ue_payouts_df['Store ID'].isin(ue_selected_stores)] if not ue_payouts_df.empty else pd.DataFrame()
-    ue_orders_filtered = ue_orders_df[ue_orders_df['Store ID'].isin(ue_selected_stores)] if not ue_orders_df.empty else pd.DataFrame()
-    ue_new_customers_filtered = ue_new_customers_df[ue_new_customers_df['Store ID'].isin(ue_selected_stores)] if not ue_new_customers_df.empty else pd.DataFrame()
-    
-    # Combine Sales
-    combined_sales = {
-        'pre_24': ((dd_sales_filtered['pre_24'].sum() if 'pre_24' in dd_sales_filtered.columns and not dd_sales_filtered.empty else 0) + 
-                   (ue_sales_filtered['pre_24'].sum() if 'pre_24' in ue_sales_filtered.columns and not ue_sales_filtered.empty else 0)),
-        'pre_25': (dd_sales_filtered['pre_25'].sum() if not dd_sales_filtered.empty else 0) + (ue_sales_filtered['pre_25'].sum() if not ue_sales_filtered.empty else 0),
-        'post_24': (dd_sales_filtered['post_24'].sum() if not dd_sales_filtered.empty else 0) + (ue_sales_filtered['post_24'].sum() if not ue_sales_filtered.empty else 0),
-        'post_25': (dd_sales_filtered['post_25'].sum() if not dd_sales_filtered.empty else 0) + (ue_sales_filtered['post_25'].sum() if not ue_sales_filtered.empty else 0),
-        'PrevsPost': (dd_sales_filtered['PrevsPost'].sum() if not dd_sales_filtered.empty else 0) + (ue_sales_filtered['PrevsPost'].sum() if not ue_sales_filtered.empty else 0),
-        'LastYear_Pre_vs_Post': (dd_sales_filtered['LastYear_Pre_vs_Post'].sum() if not dd_sales_filtered.empty else 0) + (ue_sales_filtered['LastYear_Pre_vs_Post'].sum() if not ue_sales_filtered.empty else 0),
-        'YoY': (dd_sales_filtered['YoY'].sum() if not dd_sales_filtered.empty else 0) + (ue_sales_filtered['YoY'].sum() if not ue_sales_filtered.empty else 0),
-    }
-    combined_sales['Growth%'] = (combined_sales['PrevsPost'] / combined_sales['pre_25'] * 100) if combined_sales['pre_25'] != 0 else 0
-    combined_sales['YoY%'] = (combined_sales['YoY'] / combined_sales['post_24'] * 100) if combined_sales['post_24'] != 0 else 0
-    
-    # Combine Payouts
-    combined_payouts = {
-        'pre_24': ((dd_payouts_filtered['pre_24'].sum() if 'pre_24' in dd_payouts_filtered.columns and not dd_payouts_filtered.empty else 0) + 
-                   (ue_payouts_filtered['pre_24'].sum() if 'pre_24' in ue_payouts_filtered.columns and not ue_payouts_filtered.empty else 0)),
-        'pre_25': (dd_payouts_filtered['pre_25'].sum() if not dd_payouts_filtered.empty else 0) + (ue_payouts_filtered['pre_25'].sum() if not ue_payouts_filtered.empty else 0),
-        'post_24': (dd_payouts_filtered['post_24'].sum() if not dd_payouts_filtered.empty else 0) + (ue_payouts_filtered['post_24'].sum() if not ue_payouts_filtered.empty else 0),
-        'post_25': (dd_payouts_filtered['post_25'].sum() if not dd_payouts_filtered.empty else 0) + (ue_payouts_filtered['post_25'].sum() if not ue_payouts_filtered.empty else 0),
-        'PrevsPost': (dd_payouts_filtered['PrevsPost'].sum() if not dd_payouts_filtered.empty else 0) + (ue_payouts_filtered['PrevsPost'].sum() if not ue_payouts_filtered.empty else 0),
-        'LastYear_Pre_vs_Post': (dd_payouts_filtered['LastYear_Pre_vs_Post'].sum() if not dd_payouts_filtered.empty else 0) + (ue_payouts_filtered['LastYear_Pre_vs_Post'].sum() if not ue_payouts_filtered.empty else 0),
-        'YoY': (dd_payouts_filtered['YoY'].sum() if not dd_payouts_filtered.empty else 0) + (ue_payouts_filtered['YoY'].sum() if not ue_payouts_filtered.empty else 0),
-    }
-    combined_payouts['Growth%'] = (combined_payouts['PrevsPost'] / combined_payouts['pre_25'] * 100) if combined_payouts['pre_25'] != 0 else 0
-    combined_payouts['YoY%'] = (combined_payouts['YoY'] / combined_payouts['post_24'] * 100) if combined_payouts['post_24'] != 0 else 0
-    
-    # Combine Orders
-    combined_orders = {
-        'pre_24': ((dd_orders_filtered['pre_24'].sum() if 'pre_24' in dd_orders_filtered.columns and not dd_orders_filtered.empty else 0) + 
-                   (ue_orders_filtered['pre_24'].sum() if 'pre_24' in ue_orders_filtered.columns and not ue_orders_filtered.empty else 0)),
-        'pre_25': (dd_orders_filtered['pre_25'].sum() if not dd_orders_filtered.empty else 0) + (ue_orders_filtered['pre_25'].sum() if not ue_orders_filtered.empty else 0),
-        'post_24': (dd_orders_filtered['post_24'].sum() if not dd_orders_filtered.empty else 0) + (ue_orders_filtered['post_24'].sum() if not ue_orders_filtered.empty else 0),
-        'post_25': (dd_orders_filtered['post_25'].sum() if not dd_orders_filtered.empty else 0) + (ue_orders_filtered['post_25'].sum() if not ue_orders_filtered.empty else 0),
-        'PrevsPost': (dd_orders_filtered['PrevsPost'].sum() if not dd_orders_filtered.empty else 0) + (ue_orders_filtered['PrevsPost'].sum() if not ue_orders_filtered.empty else 0),
-        'LastYear_Pre_vs_Post': (dd_orders_filtered['LastYear_Pre_vs_Post'].sum() if not dd_orders_filtered.empty else 0) + (ue_orders_filtered['LastYear_Pre_vs_Post'].sum() if not ue_orders_filtered.empty else 0),
-        'YoY': (dd_orders_filtered['YoY'].sum() if not dd_orders_filtered.empty else 0) + (ue_orders_filtered['YoY'].sum() if not ue_orders_filtered.empty else 0),
-    }
-    combined_orders['Growth%'] = (combined_orders['PrevsPost'] / combined_orders['pre_25'] * 100) if combined_orders['pre_25'] != 0 else 0
-    combined_orders['YoY%'] = (combined_orders['YoY'] / combined_orders['post_24'] * 100) if combined_orders['post_24'] != 0 else 0
-    
-    # Combine New Customers
-    # For DD: mkt files use different Store IDs than main files, so sum ALL new customers
-    # Don't filter by selected stores - aggregate all from mkt files
-    if not dd_new_customers_df.empty and all(col in dd_new_customers_df.columns for col in ['pre_24', 'post_24', 'pre_25', 'post_25']):
-        dd_nc_pre_25 = dd_new_customers_df['pre_25'].sum()
-        dd_nc_post_25 = dd_new_customers_df['post_25'].sum()
-        dd_nc_pre_24 = dd_new_customers_df['pre_24'].sum()
-        dd_nc_post_24 = dd_new_customers_df['post_24'].sum()
+    return _cached_combined_summary_tables(dd_sales_df, dd_payouts_df, dd_orders_df, dd_new_customers_df,
+                                           ue_sales_df, ue_payouts_df, ue_orders_df,
+                                           tuple(sorted(set(dd_selected_stores))), tuple(sorted(set(ue_selected_stores))),
+                                           st.session_state.get('ue_new_customers_totals', {}))
+
+
+@st.cache_data
+def _cached_combined_summary_tables(dd_sales_df, dd_payouts_df, dd_orders_df, dd_new_customers_df,
+                                    ue_sales_df, ue_payouts_df, ue_orders_df,
+                                    dd_selected_stores, ue_selected_stores, ue_new_customers_totals):
+    """Cached body of create_combined_summary_tables, keyed on the frames, store tuples and UE totals"""
+    # Add the raw platform totals; Growth%, Profitability etc. are derived from the combined values
+    totals = _summarize(dd_sales_df, dd_payouts_df, dd_orders_df, dd_new_customers_df, set(dd_selected_stores))
+    totals += _summarize(ue_sales_df, ue_payouts_df, ue_orders_df, None, set(ue_selected_stores), ue_new_customers_totals)
+    return _to_tables(totals)
+
+
+def _by_store(table, columns=None):
+    """Index a store-level table by Store ID, optionally keeping only the given columns"""
+    if 'Store ID' in table.columns:
+        # set_index already returns a new frame, so no defensive copy is needed first
+        table = table.set_index('Store ID')
     else:
-        dd_nc_pre_25 = dd_nc_post_25 = dd_nc_pre_24 = dd_nc_post_24 = 0
-    
-    # For UE: use platform-level totals from session state
-    ue_nc_pre_25 = st.session_state.get('ue_new_customers_totals', {}).get('pre_25', 0)
-    ue_nc_post_25 = st.session_state.get('ue_new_customers_totals', {}).get('post_25', 0)
-    ue_nc_pre_24 = st.session_state.get('ue_new_customers_totals', {}).get('pre_24', 0)
-    ue_nc_post_24 = st.session_state.get('ue_new_customers_totals', {}).get('post_24', 0)
-    
-    combined_new_customers = {
-        'pre_25': dd_nc_pre_25 + ue_nc_pre_25,
-        'post_25': dd_nc_post_25 + ue_nc_post_25,
-        'PrevsPost': (dd_nc_post_25 + ue_nc_post_25) - (dd_nc_pre_25 + ue_nc_pre_25),
-        'LastYear_Pre_vs_Post': (dd_nc_post_24 + ue_nc_post_24) - (dd_nc_pre_24 + ue_nc_pre_24),
-        'post_24': dd_nc_post_24 + ue_nc_post_24,
-        'YoY': (dd_nc_post_25 + ue_nc_post_25) - (dd_nc_post_24 + ue_nc_post_24),
-    }
-    combined_new_customers['Growth%'] = (combined_new_customers['PrevsPost'] / combined_new_customers['pre_25'] * 100) if combined_new_customers['pre_25'] != 0 else 0
-    combined_new_customers['YoY%'] = (combined_new_customers['YoY'] / combined_new_customers['post_24'] * 100) if combined_new_customers['post_24'] != 0 else 0
-    
-    # Round to 1 decimal place
-    for key in combined_sales:
-        if isinstance(combined_sales[key], (int, float)):
-            combined_sales[key] = round(combined_sales[key], 1)
-    for key in combined_payouts:
-        if isinstance(combined_payouts[key], (int, float)):
-            combined_payouts[key] = round(combined_payouts[key], 1)
-    for key in combined_orders:
-        if isinstance(combined_orders[key], (int, float)):
-            combined_orders[key] = round(combined_orders[key], 1)
-    for key in combined_new_customers:
-        if isinstance(combined_new_customers[key], (int, float)):
-            combined_new_customers[key] = round(combined_new_customers[key], 1)
-    
-    # Calculate Profitability (Payouts/Sales%) and Average Check (Sales/Orders)
-    # Profitability: Pre
-    profitability_pre = (combined_payouts.get('pre_25', 0) / combined_sales.get('pre_25', 1) * 100) if combined_sales.get('pre_25', 0) != 0 else 0
-    # Profitability: Post
-    profitability_post = (combined_payouts.get('post_25', 0) / combined_sales.get('post_25', 1) * 100) if combined_sales.get('post_25', 0) != 0 else 0
-    # Profitability: PrevsPost
-    profitability_prevs_post = profitability_post - profitability_pre
-    # Profitability: LastYear Pre vs Post
-    profitability_last_year_pre = (combined_payouts.get('pre_24', 0) / combined_sales.get('pre_24', 1) * 100) if combined_sales.get('pre_24', 0) != 0 else 0
-    profitability_last_year_post = (combined_payouts.get('post_24', 0) / combined_sales.get('post_24', 1) * 100) if combined_sales.get('post_24', 0) != 0 else 0
-    profitability_last_year_prevs_post = profitability_last_year_post - profitability_last_year_pre
-    # Profitability: Growth%
-    profitability_growth = (profitability_prevs_post / profitability_pre * 100) if profitability_pre != 0 else 0
-    # Profitability: YoY
-    profitability_yoy = profitability_post - profitability_last_year_post
-    # Profitability: YoY%
-    profitability_yoy_pct = (profitability_yoy / profitability_last_year_post * 100) if profitability_last_year_post != 0 else 0
-    
-    profitability_summary = {
-        'pre_25': round(profitability_pre, 1),
-        'post_25': round(profitability_post, 1),
-        'PrevsPost': round(profitability_prevs_post, 1),
-        'LastYear_Pre_vs_Post': round(profitability_last_year_prevs_post, 1),
-        'post_24': round(profitability_last_year_post, 1),
-        'YoY': round(profitability_yoy, 1),
-        'Growth%': round(profitability_growth, 1),
-        'YoY%': round(profitability_yoy_pct, 1)
-    }
-    
-    # Average Check: Pre
-    aov_pre = (combined_sales.get('pre_25', 0) / combined_orders.get('pre_25', 1)) if combined_orders.get('pre_25', 0) != 0 else 0
-    # Average Check: Post
-    aov_post = (combined_sales.get('post_25', 0) / combined_orders.get('post_25', 1)) if combined_orders.get('post_25', 0) != 0 else 0
-    # Average Check: PrevsPost
-    aov_prevs_post = aov_post - aov_pre
-    # Average Check: LastYear Pre vs Post
-    aov_last_year_pre = (combined_sales.get('pre_24', 0) / combined_orders.get('pre_24', 1)) if combined_orders.get('pre_24', 0) != 0 else 0
-    aov_last_year_post = (combined_sales.get('post_24', 0) / combined_orders.get('post_24', 1)) if combined_orders.get('post_24', 0) != 0 else 0
-    aov_last_year_prevs_post = aov_last_year_post - aov_last_year_pre
-    # Average Check: Growth%
-    aov_growth = (aov_prevs_post / aov_pre * 100) if aov_pre != 0 else 0
-    # Average Check: YoY
-    aov_yoy = aov_post - aov_last_year_post
-    # Average Check: YoY%
-    aov_yoy_pct = (aov_yoy / aov_last_year_post * 100) if aov_last_year_post != 0 else 0
-    
-    aov_summary = {
-        'pre_25': round(aov_pre, 1),
-        'post_25': round(aov_post, 1),
-        'PrevsPost': round(aov_prevs_post, 1),
-        'LastYear_Pre_vs_Post': round(aov_last_year_prevs_post, 1),
-        'post_24': round(aov_last_year_post, 1),
-        'YoY': round(aov_yoy, 1),
-        'Growth%': round(aov_growth, 1),
-        'YoY%': round(aov_yoy_pct, 1)
-    }
-    
-    # Create Table 1: Pre vs Post
-    table1_data = {
-        'Metric': ['Sales', 'Payouts', 'Orders', 'New Customers', 'Profitability', 'Average Check'],
-        'Pre': [combined_sales['pre_25'], combined_payouts['pre_25'], combined_orders['pre_25'], combined_new_customers['pre_25'], profitability_summary['pre_25'], aov_summary['pre_25']],
-        'Post': [combined_sales['post_25'], combined_payouts['post_25'], combined_orders['post_25'], combined_new_customers['post_25'], profitability_summary['post_25'], aov_summary['post_25']],
-        'PrevsPost': [combined_sales['PrevsPost'], combined_payouts['PrevsPost'], combined_orders['PrevsPost'], combined_new_customers['PrevsPost'], profitability_summary['PrevsPost'], aov_summary['PrevsPost']],
-        'LastYear Pre vs Post': [combined_sales['LastYear_Pre_vs_Post'], combined_payouts['LastYear_Pre_vs_Post'], combined_orders['LastYear_Pre_vs_Post'], combined_new_customers['LastYear_Pre_vs_Post'], profitability_summary['LastYear_Pre_vs_Post'], aov_summary['LastYear_Pre_vs_Post']],
-        'Growth%': [combined_sales['Growth%'], combined_payouts['Growth%'], combined_orders['Growth%'], combined_new_customers['Growth%'], profitability_summary['Growth%'], aov_summary['Growth%']]
-    }
-    table1_df = pd.DataFrame(table1_data)
-    table1_df = table1_df.set_index('Metric')
-    
-    # Create Table 2: YoY
-    table2_data = {
-        'Metric': ['Sales', 'Payouts', 'Orders', 'New Customers', 'Profitability', 'Average Check'],
-        'last year-post': [combined_sales['post_24'], combined_payouts['post_24'], combined_orders['post_24'], combined_new_customers['post_24'], profitability_summary['post_24'], aov_summary['post_24']],
-        'post': [combined_sales['post_25'], combined_payouts['post_25'], combined_orders['post_25'], combined_new_customers['post_25'], profitability_summary['post_25'], aov_summary['post_25']],
-        'YoY': [combined_sales['YoY'], combined_payouts['YoY'], combined_orders['YoY'], combined_new_customers['YoY'], profitability_summary['YoY'], aov_summary['YoY']],
-        'YoY%': [combined_sales['YoY%'], combined_payouts['YoY%'], combined_orders['YoY%'], combined_new_customers['YoY%'], profitability_summary['YoY%'], aov_summary['YoY%']]
-    }
-    table2_df = pd.DataFrame(table2_data)
-    table2_df = table2_df.set_index('Metric')
-    
-    return table1_df, table2_df
+        table = table.copy(deep=False)
+    return table if columns is None else table[columns]
+
+
+def _store_pct(change, base):
+    """change / base * 100 per store, rounded to 1 decimal and 0 where base is 0"""
+    change = change.to_numpy(dtype=float)
+    base = base.to_numpy(dtype=float)
+    return np.round(np.divide(change, base, out=np.zeros_like(base), where=base != 0) * 100, 1)
+
+
+def _combine_store_table(tables, value_cols, pct_col):
+    """Sum the available platforms' store-level tables per Store ID and re-derive their percentage column
+
+    value_cols are (base, current, change, ...): pct_col is change / base, and rows
+    where both base and current are 0 are dropped, as are rows without a Store ID.
+    A single available table is returned as is (indexed by Store ID); None if there are none.
+    """
+    tables = [table for table in tables if table is not None]
+    if not tables:
+        return None
+    if len(tables) == 1:
+        return _by_store(tables[0])
+    if USE_POLARS and pl is not None:
+        return _combine_store_table_polars(tables, value_cols, pct_col)
+    # Stack all platforms and reduce per store in one groupby; a store missing from a platform adds nothing
+    combined = pd.concat([_by_store(table, value_cols) for table in tables]).groupby(level=0).sum()
+    combined[pct_col] = _store_pct(combined[value_cols[2]], combined[value_cols[0]])
+    store_ids = combined.index
+    return drop_empty_rows(combined[store_ids.notna() & (store_ids != '')], value_cols[:2])
+
+
+def _combine_store_table_polars(tables, value_cols, pct_col):
+    """Polars version of _combine_store_table for two or more tables, enabled by USE_POLARS"""
+    frames = []
+    for table in tables:
+        table = _by_store(table, value_cols)
+        if isinstance(table.index.dtype, pd.CategoricalDtype):
+            # Plain values so the platforms' Store IDs concatenate without reconciling categories
+            table.index = table.index.astype(table.index.categories.dtype)
+        frames.append(pl.from_pandas(table.reset_index()).lazy())
+    base, current, change = value_cols[:3]
+    combined = (pl.concat(frames, how='vertical_relaxed')
+                .filter(pl.col('Store ID').is_not_null() & (pl.col('Store ID').cast(pl.Utf8) != ''))
+                .group_by('Store ID')
+                .agg(pl.col(value_cols).sum())
+                .filter((pl.col(base) != 0) | (pl.col(current) != 0))
+                .with_columns(pl.when(pl.col(base) != 0)
+                              .then(pl.col(change) / pl.col(base) * 100)
+                              .otherwise(0.0)
+                              .round(1)
+                              .alias(pct_col))
+                .sort('Store ID')
+                .collect())
+    return combined.to_pandas().set_index('Store ID')
 
 
 def create_combined_store_tables(dd_table1, dd_table2, ue_table1, ue_table2):
     """Combine store-level tables from DD and UE, summing values for stores that appear in both"""
-    combined_table1 = None
-    combined_table2 = None
-    
-    # Combine Table 1 (Pre vs Post)
-    if dd_table1 is not None and ue_table1 is not None:
-        # Reset index to merge
-        dd_t1 = dd_table1.reset_index()
-        ue_t1 = ue_table1.reset_index()
-        # Merge on Store ID, summing values for stores that appear in both
-        combined_table1 = pd.merge(dd_t1, ue_t1, on='Store ID', how='outer', suffixes=('_dd', '_ue'))
-        # Sum numeric columns for stores in both platforms
-        numeric_cols = ['Pre', 'Post', 'PrevsPost', 'LastYear Pre vs Post']
-        for col in numeric_cols:
-            if f'{col}_dd' in combined_table1.columns and f'{col}_ue' in combined_table1.columns:
-                combined_table1[col] = combined_table1[f'{col}_dd'].fillna(0) + combined_table1[f'{col}_ue'].fillna(0)
-                combined_table1 = combined_table1.drop(columns=[f'{col}_dd', f'{col}_ue'])
-            elif f'{col}_dd' in combined_table1.columns:
-                combined_table1[col] = combined_table1[f'{col}_dd']
-                combined_table1 = combined_table1.drop(columns=[f'{col}_dd'])
-            elif f'{col}_ue' in combined_table1.columns:
-                combined_table1[col] = combined_table1[f'{col}_ue']
-                combined_table1 = combined_table1.drop(columns=[f'{col}_ue'])
-        # Handle Growth% - recalculate from summed values
-        if 'Pre' in combined_table1.columns and 'PrevsPost' in combined_table1.columns:
-            combined_table1['Growth%'] = (combined_table1['PrevsPost'] / combined_table1['Pre'] * 100).replace([float('inf'), -float('inf')], 0).fillna(0).round(1)
-        # Keep only the needed columns
-        combined_table1 = combined_table1[['Store ID', 'Pre', 'Post', 'PrevsPost', 'LastYear Pre vs Post', 'Growth%']]
-        # Filter out rows with empty Store ID or where both Pre and Post are 0 or NaN (no data)
-        combined_table1 = combined_table1[
-            (combined_table1['Store ID'].notna()) &
-            (combined_table1['Store ID'] != '') &
-            ((combined_table1['Pre'].fillna(0) != 0) | (combined_table1['Post'].fillna(0) != 0))
-        ].copy()
-        combined_table1 = combined_table1.reset_index(drop=True)
-        combined_table1 = combined_table1.set_index('Store ID')
-    elif dd_table1 is not None:
-        dd_t1 = dd_table1.copy()
-        if 'Store ID' in dd_t1.columns:
-            combined_table1 = dd_t1.set_index('Store ID')
-        else:
-            combined_table1 = dd_t1
-    elif ue_table1 is not None:
-        ue_t1 = ue_table1.copy()
-        if 'Store ID' in ue_t1.columns:
-            combined_table1 = ue_t1.set_index('Store ID')
-        else:
-            combined_table1 = ue_t1
-    
-    # Combine Table 2 (YoY)
-    if dd_table2 is not None and ue_table2 is not None:
-        dd_t2 = dd_table2.reset_index()
-        ue_t2 = ue_table2.reset_index()
-        # Merge on Store ID, summing values for stores that appear in both
-        combined_table2 = pd.merge(dd_t2, ue_t2, on='Store ID', how='outer', suffixes=('_dd', '_ue'))
-        # Sum numeric columns for stores in both platforms
-        numeric_cols = ['last year-post', 'post', 'YoY']
-        for col in numeric_cols:
-            if f'{col}_dd' in combined_table2.columns and f'{col}_ue' in combined_table2.columns:
-                combined_table2[col] = combined_table2[f'{col}_dd'].fillna(0) + combined_table2[f'{col}_ue'].fillna(0)
-                combined_table2 = combined_table2.drop(columns=[f'{col}_dd', f'{col}_ue'])
-            elif f'{col}_dd' in combined_table2.columns:
-                combined_table2[col] = combined_table2[f'{col}_dd']
-                combined_table2 = combined_table2.drop(columns=[f'{col}_dd'])
-            elif f'{col}_ue' in combined_table2.columns:
-                combined_table2[col] = combined_table2[f'{col}_ue']
-                combined_table2 = combined_table2.drop(columns=[f'{col}_ue'])
-        # Handle YoY% - recalculate from summed values
-        if 'last year-post' in combined_table2.columns and 'YoY' in combined_table2.columns:
-            combined_table2['YoY%'] = (combined_table2['YoY'] / combined_table2['last year-post'] * 100).replace([float('inf'), -float('inf')], 0).fillna(0).round(1)
-        # Keep only the needed columns
-        combined_table2 = combined_table2[['Store ID', 'last year-post', 'post', 'YoY', 'YoY%']]
-        # Filter out rows with empty Store ID or where both last year-post and post are 0 or NaN (no data)
-        combined_table2 = combined_table2[
-            (combined_table2['Store ID'].notna()) &
-            (combined_table2['Store ID'] != '') &
-            ((combined_table2['last year-post'].fillna(0) != 0) | (combined_table2['post'].fillna(0) != 0))
-        ].copy()
-        combined_table2 = combined_table2.reset_index(drop=True)
-        combined_table2 = combined_table2.set_index('Store ID')
-    elif dd_table2 is not None:
-        dd_t2 = dd_table2.copy()
-        if 'Store ID' in dd_t2.columns:
-            combined_table2 = dd_t2.set_index('Store ID')
-        else:
-            combined_table2 = dd_t2
-    elif ue_table2 is not None:
-        ue_t2 = ue_table2.copy()
-        if 'Store ID' in ue_t2.columns:
-            combined_table2 = ue_t2.set_index('Store ID')
-        else:
-            combined_table2 = ue_t2
-    
+    # Table 1 (Pre vs Post) and Table 2 (YoY), recalculating Growth% / YoY% from the summed values
+    combined_table1 = _combine_store_table([dd_table1, ue_table1], ['Pre', 'Post', 'PrevsPost', 'LastYear Pre vs Post'], 'Growth%')
+    combined_table2 = _combine_store_table([dd_table2, ue_table2], ['last year-post', 'post', 'YoY'], 'YoY%')
     return combined_table1, combined_table2
 
 
+def _platform_selection(sales_df, platform_key):
+    """Stores selected for a platform in session state, or all of its stores if nothing is selected yet"""
+    # Single session_state lookup; the all-stores default is only built when needed
+    selected_stores = st.session_state.get(platform_key)
+    if selected_stores is None:
+        selected_stores = sorted_store_ids(sales_df)
+    return selected_stores
+
+
 def get_platform_store_tables(sales_df, platform_key):
     """Get store-level tables without displaying"""
-    selected_stores = st.session_state.get(platform_key, sorted(sales_df['Store ID'].unique().tolist()))
-    filtered_sales_df = sales_df[sales_df['Store ID'].isin(selected_stores)].copy()
+    selected_stores = _platform_selection(sales_df, platform_key)
+    return _cached_store_tables(sales_df, tuple(sorted(set(selected_stores))))
+
+
+@st.cache_data
+def _cached_store_tables(sales_df, selected_stores):
+    """Cached body of get_platform_store_tables, keyed on the frame and the store tuple"""
+    filtered_sales_df = filter_stores(sales_df, selected_stores)
     
     if filtered_sales_df.empty:
         return None, None
     
     # Table 1
-    table1_df = filtered_sales_df[['Store ID', 'pre_25', 'post_25', 'PrevsPost', 'LastYear_Pre_vs_Post', 'Growth%']].copy()
-    table1_df = table1_df.rename(columns={
+    table1_df = filtered_sales_df[['Store ID', 'pre_25', 'post_25', 'PrevsPost', 'LastYear_Pre_vs_Post', 'Growth%']].rename(columns={
         'pre_25': 'Pre',
         'post_25': 'Post',
         'PrevsPost': 'PrevsPost',
@@ -504,28 +271,19 @@ def get_platform_store_tables(sales_df, platform_key):
         'Growth%': 'Growth%'
     })
     # Filter out rows with empty Store ID or all zero values
-    table1_df = table1_df[
-        (table1_df['Store ID'].notna()) & 
-        (table1_df['Store ID'] != '') &
-        ((table1_df['Pre'].fillna(0) != 0) | (table1_df['Post'].fillna(0) != 0))
-    ].copy()
+    table1_df = drop_empty_rows(table1_df[table1_df['Store ID'].notna() & (table1_df['Store ID'] != '')], ['Pre', 'Post'])
     # Reset index to remove any gaps
     table1_df = table1_df.reset_index(drop=True)
     
     # Table 2 (YoY)
-    table2_df = filtered_sales_df[['Store ID', 'post_24', 'post_25', 'YoY', 'YoY%']].copy()
-    table2_df = table2_df.rename(columns={
+    table2_df = filtered_sales_df[['Store ID', 'post_24', 'post_25', 'YoY', 'YoY%']].rename(columns={
         'post_24': 'last year-post',
         'post_25': 'post',
         'YoY': 'YoY',
         'YoY%': 'YoY%'
     })
     # Filter out rows with empty Store ID or all zero values
-    table2_df = table2_df[
-        (table2_df['Store ID'].notna()) & 
-        (table2_df['Store ID'] != '') &
-        ((table2_df['last year-post'].fillna(0) != 0) | (table2_df['post'].fillna(0) != 0))
-    ].copy()
+    table2_df = drop_empty_rows(table2_df[table2_df['Store ID'].notna() & (table2_df['Store ID'] != '')], ['last year-post', 'post'])
     # Reset index to remove any gaps
     table2_df = table2_df.reset_index(drop=True)
     
@@ -534,5 +292,5 @@ def get_platform_store_tables(sales_df, platform_key):
 
 def get_platform_summary_tables(sales_df, payouts_df, orders_df, new_customers_df, platform_key, is_ue=False):
     """Get summary tables without displaying"""
-    selected_stores = st.session_state.get(platform_key, sorted(sales_df['Store ID'].unique().tolist()))
+    selected_stores = _platform_selection(sales_df, platform_key)
     return create_summary_tables(sales_df, payouts_df, orders_df, new_customers_df, selected_stores, is_ue=is_ue)
@@ -0,0 +1,39 @@
+"""Regression check: DD slot totals are the same with the pyarrow and the pandas CSV readers"""
+
+import pandas as pd
+
+import utils
+from slot_analysis import process_slot_analysis
+
+DD_ROWS = [
+    # Timestamp local date, Timestamp local time, Merchant store ID, Subtotal, Net total
+    ('01/06/2025', '02:10:00', 'S1', 10.25, 8.10),
+    ('01/06/2025', '09:13:00', 'S1', 21.50, 17.20),
+    ('01/07/2025', '12:45:00', 'S2', 33.75, 27.00),
+    ('01/08/2025', '15:30:00', 'S2', 12.00, 9.60),
+    ('01/20/2025', '18:05:00', 'S1', 45.10, 36.08),
+    ('01/21/2025', '21:40:00', 'S2', 19.99, 15.99),
+    ('01/20/2024', '09:13:00', 'S1', 14.30, 11.44),
+    ('01/21/2024', '18:05:00', 'S2', 27.80, 22.24),
+]
+
+
+def _write_dd_file(path):
+    pd.DataFrame(DD_ROWS, columns=['Timestamp local date', 'Timestamp local time', 'Merchant store ID',
+                                   'Subtotal', 'Net total']).to_csv(path, index=False)
+    return path
+
+
+def _slot_tables(path):
+    return process_slot_analysis(path, '01/01/2025', '01/10/2025', '01/15/2025', '01/25/2025')
+
+
+def test_dd_slot_totals_match_pandas_reader(tmp_path, monkeypatch):
+    arrow_tables = _slot_tables(_write_dd_file(tmp_path / 'dd-arrow.csv'))
+    # A different file path, so the cached master frame is not shared between the two readers
+    monkeypatch.setattr(utils, 'pa_csv', None)
+    pandas_tables = _slot_tables(_write_dd_file(tmp_path / 'dd-pandas.csv'))
+
+    assert arrow_tables[0]['Pre'].sum() > 0
+    for arrow_table, pandas_table in zip(arrow_tables, pandas_tables):
+        pd.testing.assert_frame_equal(arrow_table, pandas_table)
@@ -0,0 +1,59 @@
+"""The opt-in Polars store-table combine matches the pandas one"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import table_generation
+from table_generation import _combine_store_table, _combine_store_table_polars
+
+pytest.importorskip('polars')
+
+TABLE1_COLS = ['Pre', 'Post', 'PrevsPost', 'LastYear Pre vs Post']
+TABLE2_COLS = ['last year-post', 'post', 'YoY']
+
+
+def _table1(store_ids, pre, post, last_year_change):
+    pre, post = np.asarray(pre, dtype=float), np.asarray(post, dtype=float)
+    return pd.DataFrame({'Store ID': store_ids, 'Pre': pre, 'Post': post, 'PrevsPost': post - pre,
+                         'LastYear Pre vs Post': last_year_change, 'Growth%': 0.0})
+
+
+def _table2(store_ids, last_year_post, post):
+    last_year_post, post = np.asarray(last_year_post, dtype=float), np.asarray(post, dtype=float)
+    return pd.DataFrame({'Store ID': store_ids, 'last year-post': last_year_post, 'post': post,
+                         'YoY': post - last_year_post, 'YoY%': 0.0})
+
+
+def _categorical(table):
+    return table.assign(**{'Store ID': table['Store ID'].astype('category')})
+
+
+def _assert_same(tables, value_cols, pct_col, monkeypatch):
+    monkeypatch.setattr(table_generation, 'USE_POLARS', False)
+    expected = _combine_store_table(tables, value_cols, pct_col)
+    result = _combine_store_table_polars(tables, value_cols, pct_col)
+    # Store IDs compare as plain values: pandas may keep object or categorical labels
+    expected.index = expected.index.astype(str)
+    result.index = result.index.astype(str)
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_table1_overlap_and_empty_store_ids(categorical, monkeypatch):
+    # '2' and '3' are on both platforms; '' and None are dropped; '5' only has zeros and is dropped
+    dd = _table1(['1', '2', '3', '', '5'], [100.0, 50.0, 0.0, 9.0, 0.0], [120.0, 40.0, 10.0, 9.0, 0.0],
+                 [5.0, -2.0, 1.0, 0.0, 0.0])
+    ue = _table1(['2', '3', '4', None], [25.0, 0.0, 80.0, 7.0], [30.0, 5.0, 60.0, 7.0], [1.5, 0.0, -3.0, 0.0])
+    if categorical:
+        dd, ue = _categorical(dd), _categorical(ue)
+    _assert_same([dd, ue], TABLE1_COLS, 'Growth%', monkeypatch)
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_table2_overlap(categorical, monkeypatch):
+    dd = _table2(['1', '2', ''], [10.0, 0.0, 3.0], [12.0, 8.0, 3.0])
+    ue = _table2(['2', '3'], [4.0, 6.0], [6.0, 0.0])
+    if categorical:
+        dd, ue = _categorical(dd), _categorical(ue)
+    _assert_same([dd, ue], TABLE2_COLS, 'YoY%', monkeypatch)
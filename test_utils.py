@@ -0,0 +1,95 @@
+"""Date filtering of master files: the cached, date-sorted range slice and the excluded-day search"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from utils import DD_DATE_COLUMN_VARIATIONS, UE_DATE_COLUMN_VARIATIONS, filter_excluded_dates, filter_master_file_by_date_range
+
+# Order ID -> date as written in the file; out of order on purpose, with two unparseable values
+DATES = {
+    'A1': '01/04/2025', 'A2': '01/01/2025', 'A3': '01/07/2025', 'A4': 'not a date', 'A5': '01/05/2025',
+    'A6': '01/08/2025', 'A7': '01/03/2025', 'A8': '', 'A9': '01/05/2025', 'A10': '01/02/2025',
+}
+
+EXCLUDED_DAY_FORMS = [['01/05/2025'], ['2025-01-05'], [date(2025, 1, 5)], [pd.Timestamp('2025-01-05')]]
+
+
+def _write_dd_file(path):
+    pd.DataFrame({
+        'Timestamp local date': list(DATES.values()),
+        'Merchant store ID': ['S1', 'S2'] * 5,
+        'Subtotal': range(10),
+        'DoorDash order ID': list(DATES),
+    }).to_csv(path, index=False)
+    return path
+
+
+def _write_ue_file(path):
+    # Title row above the header; the date is the 9th column
+    columns = ['Store ID', 'Store Name', 'Order ID', 'Workflow ID', 'Dining Mode', 'Payment Mode',
+               'Order Channel', 'Order Status', 'Order Date', 'Sales (excl. tax)']
+    df = pd.DataFrame({col: 'x' for col in columns}, index=range(len(DATES)))
+    df['Order ID'] = list(DATES)
+    df['Order Date'] = list(DATES.values())
+    df['Sales (excl. tax)'] = range(10)
+    path.write_text('Payment details report\n' + df.to_csv(index=False))
+    return path
+
+
+def _order_ids(df, id_col):
+    return set(df[id_col])
+
+
+@pytest.fixture(params=['dd', 'ue'])
+def master_file(request, tmp_path):
+    """(path, date column names, order ID column) for a synthetic DD or UE master file"""
+    if request.param == 'dd':
+        return _write_dd_file(tmp_path / 'dd-data.csv'), DD_DATE_COLUMN_VARIATIONS, 'DoorDash order ID'
+    return _write_ue_file(tmp_path / 'ue-data.csv'), UE_DATE_COLUMN_VARIATIONS, 'Order ID'
+
+
+def test_range_is_inclusive_and_drops_unparseable_dates(master_file):
+    path, date_cols, id_col = master_file
+    df = filter_master_file_by_date_range(path, '01/03/2025', '01/07/2025', date_cols)
+    assert _order_ids(df, id_col) == {'A1', 'A3', 'A5', 'A7', 'A9'}
+
+
+def test_single_day_range(master_file):
+    path, date_cols, id_col = master_file
+    df = filter_master_file_by_date_range(path, date(2025, 1, 5), date(2025, 1, 5), date_cols)
+    assert _order_ids(df, id_col) == {'A5', 'A9'}
+
+
+def test_range_outside_the_file_is_empty(master_file):
+    path, date_cols, _ = master_file
+    assert filter_master_file_by_date_range(path, '02/01/2025', '02/28/2025', date_cols).empty
+
+
+@pytest.mark.parametrize('excluded_dates', EXCLUDED_DAY_FORMS)
+def test_excluded_days_in_any_form(master_file, excluded_dates):
+    path, date_cols, id_col = master_file
+    df = filter_master_file_by_date_range(path, '01/01/2025', '01/08/2025', date_cols, excluded_dates)
+    assert _order_ids(df, id_col) == {'A1', 'A2', 'A3', 'A6', 'A7', 'A10'}
+
+
+def test_excluded_days_outside_the_range_change_nothing(master_file):
+    path, date_cols, id_col = master_file
+    df = filter_master_file_by_date_range(path, '01/03/2025', '01/04/2025', date_cols,
+                                          ['12/31/2024', '01/02/2025', '01/31/2025'])
+    assert _order_ids(df, id_col) == {'A1', 'A7'}
+
+
+def test_excluded_days_on_unparsed_column():
+    df = pd.DataFrame({'Date': ['01/04/2025', '2025-01-05', 'bad', None, '01/06/2025'], 'v': range(5)})
+    assert filter_excluded_dates(df, 'Date', ['01/05/2025'])['v'].tolist() == [0, 4]
+
+
+@pytest.mark.parametrize('tz', ['UTC', 'US/Eastern'])
+@pytest.mark.parametrize('excluded_dates', EXCLUDED_DAY_FORMS)
+def test_excluded_days_on_tz_aware_column(tz, excluded_dates):
+    # Late-evening times: the local calendar day decides, whatever the offset from UTC
+    dates = pd.to_datetime(['2025-01-04 23:30', '2025-01-05 00:15', '2025-01-05 23:45', '2025-01-06 00:00', None])
+    df = pd.DataFrame({'Date': dates.tz_localize(tz), 'v': range(5)})
+    assert filter_excluded_dates(df, 'Date', excluded_dates)['v'].tolist() == [0, 3]
@@ -1,12 +1,39 @@
 """Utility functions for data processing"""
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; read_master_csv falls back to the pandas parser
+    pa = pa_csv = None
+
+try:
+    # Arrow-backed strings with NaN for missing values: the default 'str' dtype from pandas 3
+    ARROW_STRING_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+except TypeError:  # pandas < 2.3 has no NaN-valued string dtype; keep object strings
+    ARROW_STRING_DTYPE = None
+
+# Copy-on-Write lets filtered and column-selected frames share data until one
+# of them is written to, so the table paths can drop defensive deep copies.
+# It is always on from pandas 3.0, where the option is deprecated.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 # Constants for date column name variations
 UE_DATE_COLUMN_VARIATIONS = ['Order Date', 'Order date', 'order date', 'order Date', 'Date', 'date']
 DD_DATE_COLUMN_VARIATIONS = ['Timestamp local date', 'Timestamp Local Date', 'Timestamp Local date', 
                               'timestamp local date', 'Date', 'date', 'Timestamp', 'timestamp']
 
+# Platform markers in master file names, matched case-insensitively in one scan each
+_UE_FILE_NAME_RE = re.compile(r'ue|ubereats', re.IGNORECASE)
+_DD_FILE_NAME_RE = re.compile(r'dd|doordash', re.IGNORECASE)
+
 
 def normalize_store_id_column(df):
     """
@@ -25,96 +52,384 @@ def normalize_store_id_column(df):
         return df, None
 
 
-def filter_excluded_dates(df, date_col, excluded_dates):
+def categorize_store_ids(df):
     """
-    Filter out excluded dates from a DataFrame.
+    Store the 'Store ID' column as a categorical.
+    Repeated isin filters and groupbys on store then work on integer codes
+    instead of hashing the ID strings each time.
+    
+    Returns:
+        The DataFrame (modified in place when it has a 'Store ID' column)
+    """
+    if 'Store ID' in df.columns and not isinstance(df['Store ID'].dtype, pd.CategoricalDtype):
+        df['Store ID'] = df['Store ID'].astype('category')
+    return df
+
+
+def sorted_store_ids(df):
+    """
+    Sorted list of the distinct Store IDs in df.
+    For a categorical 'Store ID' the used categories are read off the codes.
+    """
+    store_ids = df['Store ID']
+    if isinstance(store_ids.dtype, pd.CategoricalDtype):
+        codes = np.unique(store_ids.cat.codes.to_numpy())
+        return sorted(store_ids.cat.categories.take(codes[codes >= 0]).tolist())
+    return sorted(store_ids.unique().tolist())
+
+
+def filter_stores(df, stores):
+    """
+    Keep only the rows whose 'Store ID' is in stores.
+    A categorical 'Store ID' (see categorize_store_ids) is matched on its
+    integer codes; other dtypes are matched directly, without a str copy.
+    
+    Args:
+        df: DataFrame with a 'Store ID' column
+        stores: Iterable of store IDs to keep
+    
+    Returns:
+        Filtered DataFrame
+    """
+    store_ids = df['Store ID']
+    if isinstance(store_ids.dtype, pd.CategoricalDtype):
+        codes = store_ids.cat.categories.get_indexer(list(stores))
+        return df[store_ids.cat.codes.isin(codes[codes >= 0])]
+    return df[store_ids.isin(stores)]
+
+
+def drop_empty_rows(df, cols):
+    """
+    Drop rows where every one of cols is zero or NaN.
+    NaN is read as 0 straight into the NumPy buffer, so no fillna copies are made.
     
     Args:
         df: DataFrame to filter
-        date_col: Name of the date column
-        excluded_dates: List of dates to exclude (can be strings in MM/DD/YYYY format or date objects)
+        cols: Value columns that decide whether a row has data
     
     Returns:
         Filtered DataFrame
     """
-    if not excluded_dates or date_col not in df.columns or df.empty:
-        return df
+    values = df[cols].to_numpy(dtype=np.float64, na_value=0.0)
+    return df.loc[(values != 0).any(axis=1)]
+
+
+def strip_column_names(df):
+    """Strip surrounding whitespace from df's column names in place, leaving the Index as is when they are already clean"""
+    if any(isinstance(col, str) and col != col.strip() for col in df.columns):
+        df.columns = df.columns.str.strip()
+
+
+def normalize_excluded_dates(excluded_dates):
+    """
+    Normalize excluded dates to a datetime64 array of midnight timestamps.
     
-    # Make a copy to avoid modifying the original
-    df = df.copy()
+    Args:
+        excluded_dates: List of dates (strings in MM/DD/YYYY format, date objects or Timestamps),
+                        or an array already returned by this function
     
-    # Convert date column to datetime if not already
-    if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
-        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    Returns:
+        Sorted, de-duplicated numpy datetime64 array, or None if there is nothing to exclude
+    """
+    if excluded_dates is None:
+        return None
+    if isinstance(excluded_dates, np.ndarray) and np.issubdtype(excluded_dates.dtype, np.datetime64):
+        return excluded_dates if len(excluded_dates) else None
     
-    # Drop rows where date conversion failed
-    df = df.dropna(subset=[date_col])
+    # The same list is passed for every file and period in a run, so parse each distinct list once
+    try:
+        return _normalize_excluded_cached(tuple(excluded_dates))
+    except TypeError:  # unhashable entries
+        return _normalize_excluded(excluded_dates)
+
+
+@lru_cache(maxsize=64)
+def _normalize_excluded_cached(excluded_dates):
+    """_normalize_excluded for a tuple of dates; the shared result is made read-only"""
+    result = _normalize_excluded(excluded_dates)
+    if result is not None:
+        result.flags.writeable = False
+    return result
+
+
+def _normalize_excluded(excluded_dates):
+    """Parse a sequence of excluded dates for normalize_excluded_dates"""
+    # Convert excluded dates to Timestamps, parsing all the strings in one call per format
+    strings = [date for date in excluded_dates if isinstance(date, str)]
+    others = [date for date in excluded_dates if not isinstance(date, str)]
     
-    if df.empty:
-        return df
+    # Try MM/DD/YYYY format first, then infer the format of each remaining string
+    parsed = pd.to_datetime(pd.Series(strings, dtype=object), format='%m/%d/%Y', errors='coerce')
+    retry = parsed.isna().to_numpy()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(pd.Series(strings, dtype=object)[retry], format='mixed', errors='coerce')
+    excluded_date_objects = list(parsed.dropna())
     
-    # Convert excluded dates to date objects
-    excluded_date_objects = []
-    for date in excluded_dates:
-        if isinstance(date, str):
-            try:
-                # Try MM/DD/YYYY format first
-                dt = pd.to_datetime(date, format='%m/%d/%Y')
-            except:
-                # Try other formats
-                dt = pd.to_datetime(date, errors='coerce')
-            if pd.notna(dt):
-                excluded_date_objects.append(dt.date())
-        elif hasattr(date, 'date'):
-            excluded_date_objects.append(date.date())
-        elif isinstance(date, pd.Timestamp):
-            excluded_date_objects.append(date.date())
-        else:
+    # Dates, datetimes and Timestamps; anything unparseable is skipped
+    try:
+        excluded_date_objects.extend(pd.to_datetime(pd.Series(others, dtype=object), errors='coerce').dropna())
+    except (TypeError, ValueError):
+        for date in others:
             try:
                 dt = pd.to_datetime(date)
-                if pd.notna(dt):
-                    excluded_date_objects.append(dt.date())
-            except:
-                pass
+            except Exception:
+                dt = pd.NaT
+            if pd.notna(dt):
+                excluded_date_objects.append(dt)
     
     if not excluded_date_objects:
+        return None
+    
+    return np.unique(pd.DatetimeIndex(excluded_date_objects).normalize().values)
+
+
+def filter_excluded_dates(df, date_col, excluded_dates):
+    """
+    Filter out excluded dates from a DataFrame.
+    
+    Args:
+        df: DataFrame to filter
+        date_col: Name of the date column
+        excluded_dates: List of dates to exclude (can be strings in MM/DD/YYYY format or date objects),
+                        or an array from normalize_excluded_dates
+    
+    Returns:
+        Filtered DataFrame
+    """
+    excluded_dates = normalize_excluded_dates(excluded_dates)
+    if excluded_dates is None or date_col not in df.columns or df.empty:
         return df
     
-    # Filter out excluded dates (compare at date level)
-    df['_date_only'] = df[date_col].dt.date
-    df = df[~df['_date_only'].isin(excluded_date_objects)]
-    df = df.drop(columns=['_date_only'])
+    # Convert date column to datetime if not already (assign returns a new frame, the input is untouched)
+    dates = df[date_col]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = parse_date_column(dates)
+        df = df.assign(**{date_col: dates})
     
-    return df
+    # tz-aware dates are compared by their local calendar day, like naive ones
+    local_dates = dates.dt.tz_localize(None) if isinstance(dates.dtype, pd.DatetimeTZDtype) else dates
+    
+    # Compare at day level on datetime64[D] values: one binary search per row into the
+    # sorted excluded days, rather than a full pass over the rows per excluded day
+    days = local_dates.to_numpy().astype('datetime64[D]')
+    excluded_days = np.unique(excluded_dates.astype('datetime64[D]'))
+    pos = np.searchsorted(excluded_days, days).clip(max=len(excluded_days) - 1)
+    excluded = excluded_days[pos] == days
+    
+    # Rows whose date failed to parse are dropped in the same single selection
+    return df[dates.notna().to_numpy() & ~excluded]
 
 
-def find_date_column(df, preferred_names):
+def _arrow_string_mapper(arrow_type):
+    """types_mapper for Table.to_pandas: Arrow strings to ARROW_STRING_DTYPE, everything else by default"""
+    if ARROW_STRING_DTYPE is not None and arrow_type == pa.string():
+        return ARROW_STRING_DTYPE
+    return None
+
+
+def read_master_csv(file_path, skip_first_row=False, usecols=None):
     """
-    Find a date column in DataFrame by case-insensitive matching.
+    Read a master CSV with pyarrow's multithreaded parser when available.
+    Falls back to pd.read_csv if pyarrow is missing or rejects the file
+    (e.g. ragged rows or duplicate header names).
     
     Args:
-        df: DataFrame to search
-        preferred_names: List of preferred column names (will be matched case-insensitively)
+        file_path: Path to the CSV file
+        skip_first_row: Skip the line above the header (UE exports)
+        usecols: Optional column names to load, matched case-insensitively and
+                 ignoring surrounding spaces; names missing from the file are skipped
     
     Returns:
-        Actual column name found, or None if not found
+        DataFrame with NumPy-backed numeric and date columns and Arrow-backed text columns
     """
-    # First try exact match
+    wanted = None if usecols is None else {col.strip().lower() for col in usecols}
+    if pa_csv is not None:
+        try:
+            read_options = pa_csv.ReadOptions(skip_rows=1 if skip_first_row else 0)
+            # The streaming reader only parses the first block, which is also where read_csv infers types
+            schema = pa_csv.open_csv(str(file_path), read_options=read_options).schema
+            # HH:MM[:SS] columns would be inferred as Arrow time and reach pandas as datetime.time
+            # objects, which the slot analysis cannot parse; keep them as text like pd.read_csv does
+            column_types = {field.name: pa.string() for field in schema if pa.types.is_time(field.type)}
+            include_columns = None if wanted is None else [n for n in schema.names if n.strip().lower() in wanted]
+            convert_options = pa_csv.ConvertOptions(column_types=column_types, include_columns=include_columns)
+            table = pa_csv.read_csv(str(file_path), read_options=read_options, convert_options=convert_options)
+            if len(set(table.column_names)) == table.num_columns:
+                # ISO dates come back as datetime64 rather than date objects; callers re-parse dates anyway.
+                # Text stays in Arrow buffers instead of one Python object per cell.
+                # split_blocks + self_destruct release each Arrow column as soon as it is converted,
+                # so peak memory stays near one copy of the file instead of the table plus the frame.
+                return table.to_pandas(date_as_object=False, types_mapper=_arrow_string_mapper,
+                                       split_blocks=True, self_destruct=True)
+        except Exception:
+            pass
+    return pd.read_csv(file_path, skiprows=[0] if skip_first_row else None,
+                       usecols=None if wanted is None else (lambda col: col.strip().lower() in wanted))
+
+
+@lru_cache(maxsize=16)
+def _master_header(file_path, version, skip_first_row):
+    """Column names of a master CSV, stripped, parsing only the header; cached per file path and version"""
+    if pa_csv is not None:
+        try:
+            read_options = pa_csv.ReadOptions(skip_rows=1 if skip_first_row else 0)
+            return tuple(name.strip() for name in pa_csv.open_csv(file_path, read_options=read_options).schema.names)
+        except Exception:
+            pass
+    return tuple(pd.read_csv(file_path, skiprows=[0] if skip_first_row else None, nrows=0).columns.str.strip())
+
+
+@lru_cache(maxsize=64)
+def _resolve_date_column(columns, preferred_names):
+    """Cached name resolution behind find_date_column, keyed on the column and name tuples"""
+    # First try exact match (set lookups rather than scanning the column tuple per name)
+    column_set = frozenset(columns)
     for name in preferred_names:
-        if name in df.columns:
+        if name in column_set:
             return name
     
     # Then try case-insensitive match
-    df_cols_lower = {col.lower(): col for col in df.columns}
+    cols_lower = {col.lower(): col for col in columns}
     for name in preferred_names:
         name_lower = name.lower()
-        if name_lower in df_cols_lower:
-            return df_cols_lower[name_lower]
+        if name_lower in cols_lower:
+            return cols_lower[name_lower]
     
     return None
 
 
-def filter_master_file_by_date_range(file_path, start_date, end_date, date_col_name, excluded_dates=None):
+def find_date_column(df, preferred_names):
+    """
+    Find a date column in DataFrame by case-insensitive matching.
+    
+    Args:
+        df: DataFrame to search
+        preferred_names: List of preferred column names (will be matched case-insensitively)
+    
+    Returns:
+        Actual column name found, or None if not found
+    """
+    return _resolve_date_column(tuple(df.columns), tuple(preferred_names))
+
+
+def _parse_master_dates(values):
+    """
+    Parse master-file date strings with explicit formats, so pandas never has to guess one:
+    MM/DD/YYYY (UE exports and most DD exports), then YYYY-MM-DD for the values still
+    unparsed, then format='mixed' for any remaining holdouts. Unparseable values become NaT.
+    """
+    parsed = pd.Series(pd.to_datetime(values, format='%m/%d/%Y', errors='coerce'))
+    for fmt in ('%Y-%m-%d', 'mixed'):
+        missing = parsed.isna().to_numpy()
+        if not missing.any():
+            break
+        if missing.all():
+            # Nothing parsed yet: take this format's result (and datetime unit) as is
+            parsed = pd.Series(pd.to_datetime(values, format=fmt, errors='coerce'))
+        else:
+            parsed[missing] = pd.to_datetime(values[missing], format=fmt, errors='coerce')
+    return parsed
+
+
+def parse_date_column(dates):
+    """
+    Parse a master-file date column to datetime64 (NaT where unparseable).
+    
+    Runs _parse_master_dates over the column's distinct values, mapped back to the rows by
+    factorized code (exports repeat a few hundred days across all of their rows).
+    No format is ever inferred, so pandas emits no per-column "Could not infer format"
+    warnings, and no warnings filter has to be swapped in around the (threaded) loads.
+    """
+    codes, uniques = pd.factorize(dates)
+    # Missing dates have code -1 and come back as NaT
+    parsed = pd.Index(_parse_master_dates(uniques)).take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(parsed, index=dates.index, name=dates.name)
+
+
+@lru_cache(maxsize=64)
+def _master_layout(file_path, version, date_col_name):
+    """
+    Inspect a master file's layout, cached per file version (mtime and size) and date column name(s).
+    
+    Args:
+        file_path: Path of the CSV file, as a string
+        version: (mtime_ns, size) of the file
+        date_col_name: Date column name, or tuple of preferred names (the UE variations mark a UE file)
+    
+    Returns:
+        Tuple of (is_ue_file, preferred_names, date_col): preferred_names is a tuple of DD date
+        column candidates (empty for UE files) and date_col the date column found in the header
+        (a UE file's 9th column), or None if there is none
+    """
+    file_name = os.path.basename(file_path)
+    
+    # Check if this is a UE file - if date_col_name holds the UE_DATE_COLUMN_VARIATIONS, it's UE
+    # Also check filename as fallback
+    is_ue_file = False
+    if isinstance(date_col_name, tuple):
+        # Compare contents - if same elements, it's UE
+        if len(date_col_name) == len(UE_DATE_COLUMN_VARIATIONS) and all(x in UE_DATE_COLUMN_VARIATIONS for x in date_col_name):
+            is_ue_file = True
+    if _UE_FILE_NAME_RE.search(file_name):
+        is_ue_file = True
+    
+    if is_ue_file:
+        # UE files use a fixed column: the 9th one of the header below the title row
+        header = _master_header(file_path, version, True)
+        return True, (), header[8] if len(header) > 8 else None
+    
+    # Resolve the date column candidates for DD files
+    if isinstance(date_col_name, str):
+        preferred_names = (date_col_name,)
+        if _DD_FILE_NAME_RE.search(file_name):
+            preferred_names = tuple(DD_DATE_COLUMN_VARIATIONS)
+    else:
+        preferred_names = date_col_name
+    return False, preferred_names, _resolve_date_column(_master_header(file_path, version, False), preferred_names)
+
+
+# One shared frame per file version and column set, bounded so that the master files of past
+# upload sessions (each in its own temp folder) are evicted instead of accumulating
+@st.cache_resource(max_entries=8, ttl=3600)
+def _load_master_file(file_path, version, is_ue_file, preferred_names, usecols=None):
+    """
+    Read a master CSV and parse its date column, cached per file path and version
+    (and per usecols, which is None or a tuple already including the date names).
+    The cached frame is shared, not copied per call: callers must treat it as read-only
+    (with Copy-on-Write, slices and assignments on them never write back to it).
+    UE files use their 9th column as the date column unless preferred_names
+    names it (needed once usecols has dropped the columns before it).
+    
+    Returns:
+        Tuple of (df, date_col), df sorted by date_col; date_col is None when no usable
+        date column was found, in which case df is returned unparsed for the caller's message.
+    """
+    # UE files have headers in row 2 (0-indexed row 1), DD files have headers in row 1
+    df = read_master_csv(file_path, skip_first_row=is_ue_file, usecols=usecols)
+    strip_column_names(df)
+    
+    # Handle date column identification
+    if is_ue_file and not preferred_names:
+        # For UE files: hardcode to 9th column (index 8) - no variation matching
+        if len(df.columns) <= 8:
+            return df, None
+        actual_date_col = df.columns[8]
+    else:
+        # For DD files: use column name matching
+        actual_date_col = find_date_column(df, list(preferred_names))
+        if actual_date_col is None:
+            return df, None
+    
+    # Convert date column to datetime - try multiple formats, each distinct value once
+    df[actual_date_col] = parse_date_column(df[actual_date_col])
+    
+    # Sorted by date (stable, so rows keep their file order within a day) so that each
+    # date range is a contiguous block the caller can slice out by binary search
+    df = df.dropna(subset=[actual_date_col]).sort_values(actual_date_col, kind='stable')
+    return df, actual_date_col
+
+
+def filter_master_file_by_date_range(file_path, start_date, end_date, date_col_name, excluded_dates=None, usecols=None):
     """
     Filter a master CSV file by date range and excluded dates.
     
@@ -124,78 +439,36 @@ def filter_master_file_by_date_range(file_path, start_date, end_date, date_col_n
         end_date: End date (MM/DD/YYYY format string or date object)
         date_col_name: Name of the date column in the CSV (or list of preferred names for case-insensitive matching)
         excluded_dates: Optional list of dates to exclude
+        usecols: Optional list of the columns the caller needs; the date column is always loaded
     
     Returns:
         Filtered DataFrame
     """
     try:
-        # Check if this is a UE file - if date_col_name is UE_DATE_COLUMN_VARIATIONS list, it's UE
-        # Also check filename as fallback
-        is_ue_file = False
-        if isinstance(date_col_name, list) and date_col_name is UE_DATE_COLUMN_VARIATIONS:
-            # Direct reference check - if same object, it's UE
-            is_ue_file = True
-        elif isinstance(date_col_name, list):
-            # Compare contents - if same elements, it's UE
-            if len(date_col_name) == len(UE_DATE_COLUMN_VARIATIONS) and all(x in UE_DATE_COLUMN_VARIATIONS for x in date_col_name):
-                is_ue_file = True
-        if 'ue' in file_path.name.lower() or 'ubereats' in file_path.name.lower():
-            is_ue_file = True
+        # File layout (UE or DD, date column candidates) is cached per file version and date column names
+        stat = file_path.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        date_col_key = date_col_name if isinstance(date_col_name, str) else tuple(date_col_name)
+        is_ue_file, preferred_names, date_col = _master_layout(str(file_path), version, date_col_key)
         
-        # UE files have headers in row 2 (0-indexed row 1), DD files have headers in row 1
-        if is_ue_file:
-            df = pd.read_csv(file_path, skiprows=[0], header=0)
+        # A file without a usable date column is reported from its header alone, without being read
+        if date_col is not None:
+            # Read + date parsing is cached per file version; only the date slice below reruns
+            # Only the requested columns plus the date column found in the header are parsed
+            if usecols is not None:
+                usecols = tuple(usecols) + (date_col,)
+            df, actual_date_col = _load_master_file(str(file_path), version, is_ue_file, (date_col,), usecols)
         else:
-            df = pd.read_csv(file_path)
-        df.columns = df.columns.str.strip()
+            actual_date_col = None
         
-        # Handle date column identification
-        if is_ue_file:
-            # For UE files: hardcode to 9th column (index 8) - no variation matching
-            if len(df.columns) > 8:
-                actual_date_col = df.columns[8]
-            else:
-                st.warning(f"UE file {file_path.name} has fewer than 9 columns. Available columns: {list(df.columns)}")
-                return pd.DataFrame()
-        else:
-            # For DD files: use column name matching
-            if isinstance(date_col_name, str):
-                preferred_names = [date_col_name]
-                if 'dd' in file_path.name.lower() or 'doordash' in file_path.name.lower():
-                    preferred_names = DD_DATE_COLUMN_VARIATIONS
+        if actual_date_col is None:
+            # The column list is only built here, for the message
+            columns = list(_master_header(str(file_path), version, is_ue_file))
+            if is_ue_file:
+                st.warning(f"UE file {file_path.name} has fewer than 9 columns. Available columns: {columns}")
             else:
-                preferred_names = date_col_name
-            
-            # Find the actual column name
-            actual_date_col = find_date_column(df, preferred_names)
-            
-            if actual_date_col is None:
-                st.warning(f"Date column not found in {file_path.name}. Tried: {preferred_names}. Available columns: {list(df.columns)[:10]}")
-                return pd.DataFrame()
-        
-        # Convert date column to datetime - try multiple formats
-        # Store original date column values before parsing
-        original_dates = df[actual_date_col].copy()
-        
-        if is_ue_file:
-            # UberEats: Always uses MM/DD/YYYY format
-            df[actual_date_col] = pd.to_datetime(df[actual_date_col], format='%m/%d/%Y', errors='coerce')
-            # Fall back to auto parsing only if format parsing fails
-            if df[actual_date_col].isna().any():
-                mask_na = df[actual_date_col].isna()
-                df.loc[mask_na, actual_date_col] = pd.to_datetime(original_dates.loc[mask_na], errors='coerce')
-        else:
-            # DoorDash: Try MM/DD/YYYY format first (most common), then YYYY-MM-DD
-            df[actual_date_col] = pd.to_datetime(df[actual_date_col], format='%m/%d/%Y', errors='coerce')
-            if df[actual_date_col].isna().all():
-                # If all failed, try YYYY-MM-DD format using original values
-                df[actual_date_col] = pd.to_datetime(original_dates, format='%Y-%m-%d', errors='coerce')
-            
-            # Fall back to automatic parsing if format doesn't match
-            if df[actual_date_col].isna().all():
-                df[actual_date_col] = pd.to_datetime(original_dates, errors='coerce')
-        
-        df = df.dropna(subset=[actual_date_col])
+                st.warning(f"Date column not found in {file_path.name}. Tried: {list(preferred_names)}. Available columns: {columns[:10]}")
+            return pd.DataFrame()
         
         # Parse start and end dates
         if isinstance(start_date, str):
@@ -208,11 +481,13 @@ def filter_master_file_by_date_range(file_path, start_date, end_date, date_col_n
         else:
             end_dt = pd.to_datetime(end_date)
         
-        # Filter by date range
-        df = df[(df[actual_date_col] >= start_dt) & (df[actual_date_col] <= end_dt)]
+        # Filter by date range: the cached frame is sorted by date, so the range is one
+        # contiguous slice found by binary search rather than two full-column comparisons
+        dates = df[actual_date_col]
+        df = df.iloc[dates.searchsorted(start_dt, side='left'):dates.searchsorted(end_dt, side='right')]
         
         # Apply excluded dates filter
-        if excluded_dates:
+        if excluded_dates is not None:
             df = filter_excluded_dates(df, actual_date_col, excluded_dates)
         
         return df